@@ -1,8 +1,60 @@
+import numpy as np
 import pandas as pd
+from student import ATTENDANCE_LEVELS, StudentCollection
+from instrumentation import stage
+
+# Columns Analyzer keeps sorted indexes on for range and top/bottom-k queries
+INDEXED_COLUMNS = ('Attendance', 'Average_Grade')
+
+
+class SortedColumnIndex:
+    """Row positions of one column in ascending value order
+
+    Built once with an O(n log n) sort; a range query is then two binary
+    searches plus a slice of the k matching positions. Missing values sort
+    last and never match a range or a top/bottom-k list.
+    """
+
+    def __init__(self, values):
+        # Kept in row order too, so filters on candidate rows never re-convert the column
+        self.values = np.asarray(values, dtype='float64')
+        self.order = np.argsort(self.values, kind='stable')
+        self.sorted_values = self.values[self.order]
+        self.valid = len(self.values) - int(np.isnan(self.values).sum())
+
+    def bounds(self, low=None, high=None):
+        """Slice of order holding the rows with low <= value <= high"""
+        values = self.sorted_values[:self.valid]
+        start = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+        stop = self.valid if high is None else int(np.searchsorted(values, high, side='right'))
+        return start, max(start, stop)
+
+    def range(self, low=None, high=None):
+        start, stop = self.bounds(low, high)
+        return self.order[start:stop]
+
+    def smallest(self, k):
+        return self.order[:min(k, self.valid)]
+
+    def largest(self, k):
+        return self.order[max(self.valid - k, 0):self.valid][::-1]
+
 
 class Analyzer:
     def __init__(self, students):
-        self.students = students
+        self._indexes = None
+        self._levels = None
+        self._level_rows = None
+        # A prebuilt frame (columnar loading) is used as-is; Student objects are built lazily
+        if isinstance(students, pd.DataFrame):
+            self.df = students
+            self._students = None
+            return
+        if isinstance(students, StudentCollection):
+            self._students = students
+            self.df = students.to_frame()
+            return
+        self._students = students
         self.df = pd.DataFrame([{
             'ID': s.student_id,
             'Name': s.name,
@@ -11,25 +63,201 @@ class Analyzer:
             'Attendance_Level': s.attendance_level
         } for s in students])
 
+    @property
+    def students(self):
+        if self._students is None:
+            self._students = StudentCollection.from_frame(self.df)
+        return self._students
+
+    @classmethod
+    def from_store(cls, store_path):
+        """Build an Analyzer over a memory-mapped columnar store"""
+        from columnar_store import open_store
+        return cls(open_store(store_path))
+
+    def build_indexes(self):
+        """Sort the indexed columns and group rows by attendance level, once
+
+        The query methods call this on first use; call it up front (e.g. before
+        caching the Analyzer) to keep the sort out of interactive requests.
+        """
+        if self._indexes is None:
+            with stage('index', rows=len(self.df)):
+                self._indexes = {col: SortedColumnIndex(self.df[col].to_numpy(dtype='float64'))
+                                 for col in INDEXED_COLUMNS}
+                self._levels = self.df['Attendance_Level'].to_numpy(dtype=object)
+                self._level_rows = {level: np.flatnonzero(self._levels == level) for level in ATTENDANCE_LEVELS}
+        return self
+
+    def find_students(self, attendance=(None, None), grade=(None, None), level=None):
+        """Rows whose Attendance and Average_Grade fall in inclusive (low, high) ranges
+
+        None leaves a bound open. Candidates come from whichever index matches
+        fewer rows, so the cost is O(log n + k) in the size k of that smaller set.
+        Rows are returned in their original order.
+        """
+        self.build_indexes()
+        ranges = {'Attendance': attendance, 'Average_Grade': grade}
+        bounds = {col: self._indexes[col].bounds(*ranges[col]) for col in INDEXED_COLUMNS}
+        driver = min(INDEXED_COLUMNS, key=lambda col: bounds[col][1] - bounds[col][0])
+        start, stop = bounds[driver]
+        positions = self._indexes[driver].order[start:stop]
+
+        for col in INDEXED_COLUMNS:
+            low, high = ranges[col]
+            if col == driver or (low is None and high is None):
+                continue
+            values = self._indexes[col].values[positions]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            positions = positions[keep]
+        if level is not None:
+            positions = positions[self._levels[positions] == level]
+        return self.df.iloc[np.sort(positions)]
+
+    def top_students(self, k, by='Average_Grade'):
+        """The k rows with the highest value of an indexed column, highest first"""
+        return self.df.iloc[self.build_indexes()._indexes[by].largest(k)]
+
+    def bottom_students(self, k, by='Average_Grade'):
+        """The k rows with the lowest value of an indexed column, lowest first"""
+        return self.df.iloc[self.build_indexes()._indexes[by].smallest(k)]
+
+    def students_at_level(self, level):
+        """Rows in one attendance level ('Low', 'Medium' or 'High')"""
+        return self.df.iloc[self.build_indexes()._level_rows[level]]
+
     def compute_statistics(self):
-        # Helper function to convert numpy types to native Python types
-        def convert_numpy(value):
-            if pd.isna(value):  # Handle NaN/None
-                return None
-            try:
-                return value.item()  # Converts numpy types to native Python types
-            except:
-                return float(value) if isinstance(value, (float, int)) else value
-
-        stats = {
-            'mean_attendance': round(float(self.df['Attendance'].mean()), 2),
-            'mean_grade': round(float(self.df['Average_Grade'].mean()), 2),
-            'max_attendance': float(self.df['Attendance'].max()),
-            'min_attendance': float(self.df['Attendance'].min()),
-            'max_grade': float(self.df['Average_Grade'].max()),
-            'min_grade': float(self.df['Average_Grade'].min()),
-            'correlation': round(float(self.df['Attendance'].corr(self.df['Average_Grade'])), 3)
-        }
-        
-        # Convert any remaining numpy types
-        return {k: convert_numpy(v) for k, v in stats.items()}
+        with stage('analyze', rows=len(self.df)):
+            return format_statistics({
+                'mean_attendance': self.df['Attendance'].mean(),
+                'mean_grade': self.df['Average_Grade'].mean(),
+                'max_attendance': self.df['Attendance'].max(),
+                'min_attendance': self.df['Attendance'].min(),
+                'max_grade': self.df['Average_Grade'].max(),
+                'min_grade': self.df['Average_Grade'].min(),
+                'correlation': self.df['Attendance'].corr(self.df['Average_Grade'])
+            })
+
+    def compute_group_statistics(self, by):
+        """Compute the compute_statistics set for every group of one or more columns
+
+        All groups are aggregated in a single vectorized groupby over counts, sums
+        and cross-products. Returns a tidy frame with one row per group: the
+        grouping columns, count (rows), the non-missing counts of each measure,
+        then the same keys as compute_statistics. Like pandas corr, the
+        correlation only uses rows where both measures are present.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        attendance = self.df['Attendance'].to_numpy(dtype='float64')
+        grade = self.df['Average_Grade'].to_numpy(dtype='float64')
+        paired = ~np.isnan(attendance) & ~np.isnan(grade)
+        # Centre on the global means so the sums-of-products formulas keep their precision
+        x = np.where(paired, attendance - np.nanmean(attendance), np.nan)
+        y = np.where(paired, grade - np.nanmean(grade), np.nan)
+        work = pd.DataFrame({
+            'attendance': attendance, 'grade': grade,
+            'x': x, 'y': y, 'xx': x * x, 'yy': y * y, 'xy': x * y
+        }, index=self.df.index)
+
+        grouped = work.groupby([self.df[col] for col in by], observed=True, sort=True, dropna=False).agg(
+            count=('attendance', 'size'),
+            attendance_count=('attendance', 'count'), grade_count=('grade', 'count'),
+            pair_count=('x', 'count'),
+            sum_x=('x', 'sum'), sum_y=('y', 'sum'),
+            sum_xx=('xx', 'sum'), sum_yy=('yy', 'sum'), sum_xy=('xy', 'sum'),
+            mean_attendance=('attendance', 'mean'), mean_grade=('grade', 'mean'),
+            max_attendance=('attendance', 'max'), min_attendance=('attendance', 'min'),
+            max_grade=('grade', 'max'), min_grade=('grade', 'min'),
+        )
+
+        n = grouped['pair_count']
+        sxx = grouped['sum_xx'] - grouped['sum_x'] ** 2 / n
+        syy = grouped['sum_yy'] - grouped['sum_y'] ** 2 / n
+        sxy = grouped['sum_xy'] - grouped['sum_x'] * grouped['sum_y'] / n
+        denominator = np.sqrt(sxx * syy)
+        correlation = (sxy / denominator).where((n > 1) & (denominator > 0))
+
+        result = grouped[['count', 'attendance_count', 'grade_count', 'mean_attendance', 'mean_grade',
+                          'max_attendance', 'min_attendance', 'max_grade', 'min_grade']].copy()
+        result['mean_attendance'] = result['mean_attendance'].round(2)
+        result['mean_grade'] = result['mean_grade'].round(2)
+        result['correlation'] = correlation.clip(-1, 1).round(3)
+        return result.reset_index()
+
+    @staticmethod
+    def compute_streaming_statistics(file_path, chunksize=100_000, deduplicate=False):
+        """Compute the compute_statistics dict from a CSV read in bounded-size chunks
+
+        Whole-row duplicates are only dropped with deduplicate=True, which
+        matches compute_statistics after load_data at 8 bytes per distinct row.
+        """
+        from dataset_manager import DatasetManager
+        from stream_stats import StreamingStatistics
+
+        accumulator = StreamingStatistics()
+        for chunk in DatasetManager(file_path).iter_chunks(chunksize, deduplicate=deduplicate):
+            accumulator.update_frame(chunk)
+        return format_statistics(accumulator.raw_statistics())
+
+    @staticmethod
+    def compute_incremental_statistics(file_path):
+        """Compute the compute_statistics dict from a dataset's persisted sufficient statistics"""
+        from dataset_manager import DatasetManager
+
+        return format_statistics(DatasetManager(file_path).load_statistics().raw_statistics())
+
+    def compute_distribution_statistics(self, relative_accuracy=0.01):
+        """Percentiles (p10/p25/median/p75/p90) and histograms of attendance and grade
+
+        Percentiles come from quantile sketches, so each is within
+        relative_accuracy of the exact value without sorting the columns.
+        """
+        from stream_stats import DistributionStatistics
+
+        distribution = DistributionStatistics(relative_accuracy).update_frame(self.df)
+        return distribution.results({'attendance': self.df['Attendance'].mean(),
+                                     'grade': self.df['Average_Grade'].mean()})
+
+    @staticmethod
+    def compute_streaming_distribution(file_path, chunksize=100_000, deduplicate=False, relative_accuracy=0.01):
+        """compute_distribution_statistics for a CSV read in bounded-size chunks"""
+        from dataset_manager import DatasetManager
+        from stream_stats import DistributionStatistics, StreamingStatistics
+
+        accumulator = StreamingStatistics()
+        distribution = DistributionStatistics(relative_accuracy)
+        for chunk in DatasetManager(file_path).iter_chunks(chunksize, deduplicate=deduplicate):
+            accumulator.update_frame(chunk)
+            distribution.update_frame(chunk)
+        # Missing values were mean-filled in the in-memory pipeline; place them at the final means
+        raw = accumulator.raw_statistics()
+        return distribution.results({'attendance': raw['mean_attendance'], 'grade': raw['mean_grade']})
+
+
+def format_statistics(raw):
+    """Round raw statistics and convert them to native Python types"""
+    # Helper function to convert numpy types to native Python types
+    def convert_numpy(value):
+        if pd.isna(value):  # Handle NaN/None
+            return None
+        try:
+            return value.item()  # Converts numpy types to native Python types
+        except:
+            return float(value) if isinstance(value, (float, int)) else value
+
+    stats = {
+        'mean_attendance': round(float(raw['mean_attendance']), 2),
+        'mean_grade': round(float(raw['mean_grade']), 2),
+        'max_attendance': float(raw['max_attendance']),
+        'min_attendance': float(raw['min_attendance']),
+        'max_grade': float(raw['max_grade']),
+        'min_grade': float(raw['min_grade']),
+        'correlation': round(float(raw['correlation']), 3)
+    }
+
+    # Convert any remaining numpy types
+    return {k: convert_numpy(v) for k, v in stats.items()}
@@ -0,0 +1,217 @@
+"""Pipeline benchmarks over deterministic synthetic cohorts
+
+    python benchmark.py generate --rows 1000000
+    python benchmark.py run --sizes 1000 100000 --output baseline.json
+    python benchmark.py compare baseline.json current.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DATA_DIR = "bench_data"
+FIRST_NAMES = ['John', 'Jane', 'Amina', 'Kofi', 'Li', 'Maria', 'Omar', 'Priya', 'Sven', 'Yuki']
+LAST_NAMES = ['Doe', 'Smith', 'Mensah', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Patel', 'Silva', 'Tanaka']
+
+
+def generate_cohort(path, rows, seed=0, nan_fraction=0.02, duplicate_fraction=0.01, chunk_rows=1_000_000):
+    """Write a synthetic Student_ID, Name, Attendance, Average_Grade CSV
+
+    Output is fully determined by rows and seed. Grades are correlated with
+    attendance, roughly nan_fraction of numeric cells are blank and about
+    duplicate_fraction of rows are exact repeats of earlier rows. Rows are
+    generated and written chunk by chunk, so 10M-row files fit in memory.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    first_names = np.asarray(FIRST_NAMES, dtype=object)
+    last_names = np.asarray(LAST_NAMES, dtype=object)
+    written = 0
+    with open(path, "w", newline="") as f:
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            attendance = np.clip(rng.normal(78, 12, n), 0, 100).round(1)
+            grade = np.clip(0.6 * attendance + rng.normal(25, 10, n), 0, 100).round(1)
+            chunk = pd.DataFrame({
+                'Student_ID': np.arange(written + 1, written + n + 1),
+                'Name': first_names[rng.integers(0, len(FIRST_NAMES), n)] + ' ' +
+                        last_names[rng.integers(0, len(LAST_NAMES), n)],
+                'Attendance': attendance,
+                'Average_Grade': grade,
+            })
+            chunk.loc[rng.random(n) < nan_fraction, 'Attendance'] = np.nan
+            chunk.loc[rng.random(n) < nan_fraction, 'Average_Grade'] = np.nan
+            # Replace some rows with copies of earlier rows in the same chunk
+            duplicates = np.flatnonzero(rng.random(n) < duplicate_fraction)
+            duplicates = duplicates[duplicates > 0]
+            sources = (rng.random(duplicates.size) * duplicates).astype('int64')
+            chunk.iloc[duplicates] = chunk.iloc[sources].to_numpy()
+            chunk.to_csv(f, header=written == 0, index=False)
+            written += n
+    return path
+
+
+def cohort_path(rows, seed=0):
+    path = os.path.join(DATA_DIR, f"cohort_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        generate_cohort(path, rows, seed)
+    return path
+
+
+def _stages(path):
+    """Ordered (name, callable) pipeline stages sharing one context dict"""
+    from dataset_manager import DatasetManager
+    from analzer import Analyzer
+    from visualizer import Visualizer
+    from report_generator import ReportGenerator
+    from pdf_report_generator import PDFReportGenerator
+
+    def load_data(ctx):
+        ctx['students'] = DatasetManager(path).load_data()
+
+    def load_data_columnar(ctx):
+        ctx['frame'] = DatasetManager(path, columnar=True).load_data()
+
+    def analyzer_init(ctx):
+        ctx['analyzer'] = Analyzer(ctx['students'])
+
+    def compute_statistics(ctx):
+        ctx['stats'] = ctx['analyzer'].compute_statistics()
+
+    def scatter_plot(ctx):
+        Visualizer(ctx['analyzer'].df).scatter_plot()
+
+    def bar_chart(ctx):
+        Visualizer(ctx['analyzer'].df).bar_chart()
+
+    def text_report(ctx):
+        ReportGenerator(ctx['stats']).generate()
+
+    def pdf_report(ctx):
+        PDFReportGenerator(ctx['stats']).generate_pdf()
+
+    return [
+        ('DatasetManager.load_data', load_data),
+        ('DatasetManager.load_data[columnar]', load_data_columnar),
+        ('Analyzer.__init__', analyzer_init),
+        ('Analyzer.compute_statistics', compute_statistics),
+        ('Visualizer.scatter_plot', scatter_plot),
+        ('Visualizer.bar_chart', bar_chart),
+        ('ReportGenerator.generate', text_report),
+        ('PDFReportGenerator.generate_pdf', pdf_report),
+    ]
+
+
+def run_benchmarks(sizes, repeat=3, seed=0, trace_memory=True, log=print):
+    """Time every stage for each cohort size and record its peak traced memory
+
+    Wall time is the best of `repeat` untraced runs. Peak memory comes from one
+    extra run under tracemalloc, kept separate because tracing slows allocation.
+    """
+    results = {}
+    for rows in sizes:
+        path = cohort_path(rows, seed)
+        ctx = {}
+        results[str(rows)] = {}
+        for name, stage in _stages(path):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                stage(ctx)
+                timings.append(time.perf_counter() - started)
+            entry = {'seconds': min(timings)}
+            if trace_memory:
+                tracemalloc.start()
+                stage(ctx)
+                entry['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            results[str(rows)][name] = entry
+            log(f"{rows:>10} {name:<38} {entry['seconds']:10.4f}s {entry.get('peak_bytes', 0) / 1024 ** 2:10.1f} MiB")
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.2, min_seconds=0.01):
+    """Return regressions where current exceeds baseline by more than threshold
+
+    Timings under min_seconds in the baseline are too noisy to gate on and are
+    skipped. Each regression is (rows, stage, metric, baseline, current, ratio).
+    """
+    regressions = []
+    for rows, stages in current['results'].items():
+        for stage, metrics in stages.items():
+            base = baseline['results'].get(rows, {}).get(stage)
+            if base is None:
+                continue
+            for metric, value in metrics.items():
+                base_value = base.get(metric)
+                if not base_value or (metric == 'seconds' and base_value < min_seconds):
+                    continue
+                ratio = value / base_value
+                if ratio > 1 + threshold:
+                    regressions.append((rows, stage, metric, base_value, value, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the attendance analysis pipeline")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Write a synthetic cohort CSV")
+    generate.add_argument('--rows', type=int, required=True)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--output')
+
+    run = commands.add_parser('run', help="Time each pipeline stage and write results as JSON")
+    run.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc peak memory pass")
+    run.add_argument('--output', default="benchmark_results.json")
+
+    compare = commands.add_parser('compare', help="Flag regressions against a baseline")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.2, help="Allowed relative slowdown (0.2 = 20%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'generate':
+        output = args.output or os.path.join(DATA_DIR, f"cohort_{args.rows}_{args.seed}.csv")
+        print(generate_cohort(output, args.rows, args.seed))
+    elif args.command == 'run':
+        report = run_benchmarks(args.sizes, args.repeat, args.seed, trace_memory=not args.no_memory)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare_results(baseline, current, args.threshold)
+        for rows, stage, metric, base_value, value, ratio in regressions:
+            print(f"REGRESSION {rows:>10} {stage:<38} {metric}: {base_value:.4g} -> {value:.4g} ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions above threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Headless command-line entry point for the attendance analysis pipeline
+
+    python cli.py cohort.csv --output-dir out
+    python cli.py term1.csv term2.csv --output-dir out --text --pdf --plots
+    python cli.py attendance_events.csv --grades grades.csv --output-dir out
+    python cli.py 'terms/*.csv' --merge --conflict latest --output-dir out
+
+Only pandas/numpy are imported up front. matplotlib/seaborn and reportlab
+are imported the first time a plot or PDF stage actually runs, so stats-only
+runs start quickly. Several CSVs can be given at once; they are processed in
+the same, already warmed-up, process.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from contextlib import nullcontext
+
+from dataset_manager import DatasetManager
+from analzer import Analyzer
+from instrumentation import StageRecorder
+
+
+def run_pipeline(source, output_dir, text=False, pdf=False, plots=False, plot_dpi=300, policies=None,
+                 grades=None, conflict='latest'):
+    """Run load -> analyze -> optional reports for one CSV and return the written paths"""
+    os.makedirs(output_dir, exist_ok=True)
+    dataset = DatasetManager(source, columnar=True, policies=policies, conflict=conflict)
+    # With grade records, source is a per-session attendance event log
+    analyzer = Analyzer(dataset.load_events(grades) if grades else dataset.load_data())
+    stats = analyzer.compute_statistics()
+
+    written = {}
+    # Columnar stores were validated on import and have no report of their own
+    if dataset.validation_report is not None and dataset.validation_report.has_issues:
+        validation_path = os.path.join(output_dir, "validation.json")
+        with open(validation_path, "w") as f:
+            json.dump(dataset.validation_report.to_dict(), f, indent=2)
+        written['validation'] = validation_path
+    stats_path = os.path.join(output_dir, "stats.json")
+    with open(stats_path, "w") as f:
+        json.dump(stats, f, indent=2)
+    written['stats'] = stats_path
+
+    if text:
+        from report_generator import ReportGenerator
+
+        text_path = os.path.join(output_dir, "summary_report.txt")
+        with open(text_path, "w") as f:
+            f.write(ReportGenerator(stats).render())
+        written['text'] = text_path
+
+    charts = None
+    if plots or pdf:
+        # The PDF embeds the charts, so it needs them rendered even when PNGs are not requested
+        from visualizer import Visualizer
+
+        charts = Visualizer(analyzer.df).render({'output': plot_dpi})['output']
+    if plots:
+        for name, png in charts.items():
+            chart_path = os.path.join(output_dir, f"{name}.png")
+            with open(chart_path, "wb") as f:
+                f.write(png)
+            written[name] = chart_path
+
+    if pdf:
+        from pdf_report_generator import PDFReportGenerator
+
+        pdf_path = PDFReportGenerator(stats, scatter_path=charts['scatter_plot'],
+                                      bar_path=charts['bar_chart']).generate_pdf(
+            os.path.join(output_dir, "summary_report.pdf"))
+        written['pdf'] = pdf_path
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze student attendance CSVs without the dashboard")
+    parser.add_argument('csv', nargs='+', help="CSV files (or columnar store directories) to analyze")
+    parser.add_argument('--output-dir', default="reports", help="Results go to <output-dir>/<csv name>/")
+    parser.add_argument('--text', action='store_true', help="Write the text report")
+    parser.add_argument('--pdf', action='store_true', help="Write the PDF report")
+    parser.add_argument('--plots', action='store_true', help="Write the chart PNGs")
+    parser.add_argument('--plot-dpi', type=int, default=300)
+    parser.add_argument('--timings', action='store_true', help="Log per-stage timings as JSON lines to stderr")
+    parser.add_argument('--policy', action='append', default=[], metavar="RULE=POLICY",
+                        help="Validation policy for a rule, e.g. out_of_range=drop (repeatable)")
+    parser.add_argument('--grades', metavar="CSV",
+                        help="Grade records; the positional CSVs are then attendance event logs")
+    parser.add_argument('--merge', action='store_true',
+                        help="Merge all CSVs (or glob patterns) by Student_ID into one dataset named 'merged'")
+    parser.add_argument('--conflict', choices=('latest', 'max', 'average'), default='latest',
+                        help="How --merge resolves a Student_ID found in several files")
+    args = parser.parse_args(argv)
+    policies = dict(item.partition('=')[::2] for item in args.policy)
+
+    if args.timings:
+        logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+
+    failures = 0
+    sources = [args.csv] if args.merge else args.csv
+    for source in sources:
+        name = "merged" if args.merge else os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+        label = name if args.merge else source
+        output_dir = os.path.join(args.output_dir, name)
+        try:
+            with StageRecorder() if args.timings else nullcontext():
+                written = run_pipeline(source, output_dir, args.text, args.pdf, args.plots, args.plot_dpi,
+                                       policies, args.grades, args.conflict)
+        except ValueError as e:
+            failures += 1
+            print(f"{label}: {e}", file=sys.stderr)
+            continue
+        print(f"{label}: " + ", ".join(written.values()))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
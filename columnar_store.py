@@ -0,0 +1,79 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from student import ATTENDANCE_LEVELS, attendance_level_codes
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+
+
+def is_store(path):
+    """True if path is a columnar store directory written by write_store"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def _code_dtype(size):
+    for dtype in ('int8', 'int16', 'int32'):
+        if size <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype('int64')
+
+
+def write_store(df, store_path):
+    """Write an Analyzer frame to store_path as one .npy file per column
+
+    Numeric columns are stored as plain arrays. Name, Attendance_Level and any
+    other non-numeric column (including extra grouping columns) are
+    dictionary-encoded as integer codes plus a JSON dictionary, so every column
+    can be memory-mapped on reopen.
+    """
+    os.makedirs(store_path, exist_ok=True)
+    columns = {}
+    for index, column in enumerate(df.columns):
+        values = df[column]
+        if column == 'Attendance_Level':
+            dictionary = list(ATTENDANCE_LEVELS)
+            codes = attendance_level_codes(df['Attendance'].to_numpy(dtype='float64')).astype('int8')
+        elif column in ('Attendance', 'Average_Grade'):
+            dictionary = None
+            values = values.to_numpy(dtype='float64')
+        elif pd.api.types.is_numeric_dtype(values):
+            dictionary = None
+            values = values.to_numpy()
+        else:
+            codes, uniques = pd.factorize(values.astype(str), sort=True)
+            dictionary = uniques.tolist()
+            codes = codes.astype(_code_dtype(len(dictionary)))
+
+        # Files are numbered since column names need not be valid file names
+        file_name = f"column_{index}.npy"
+        if dictionary is None:
+            np.save(os.path.join(store_path, file_name), np.ascontiguousarray(values))
+            columns[column] = {'kind': 'array', 'file': file_name}
+        else:
+            np.save(os.path.join(store_path, file_name), codes)
+            columns[column] = {'kind': 'dictionary', 'file': file_name, 'dictionary': dictionary}
+
+    meta = {'version': STORE_VERSION, 'rows': int(len(df)), 'columns': columns}
+    # Meta is written last so a partially written store is never mistaken for a complete one
+    with open(os.path.join(store_path, META_FILE), "w") as f:
+        json.dump(meta, f)
+    return store_path
+
+
+def open_store(store_path):
+    """Open a columnar store as an Analyzer frame backed by read-only memory maps"""
+    with open(os.path.join(store_path, META_FILE), "r") as f:
+        meta = json.load(f)
+    if meta.get('version') != STORE_VERSION:
+        raise ValueError(f"Unsupported columnar store version: {meta.get('version')}")
+
+    data = {}
+    for column, spec in meta['columns'].items():
+        values = np.load(os.path.join(store_path, spec['file']), mmap_mode='r')
+        if spec['kind'] == 'dictionary':
+            values = pd.Categorical.from_codes(values, categories=spec['dictionary'])
+        data[column] = values
+    return pd.DataFrame(data, copy=False)
@@ -1,13 +1,51 @@
 import streamlit as st
-import seaborn as sns
-import matplotlib.pyplot as plt
-import os
+import pandas as pd
+from contextlib import nullcontext
 
 from dataset_manager import DatasetManager
 from analzer import Analyzer
 from visualizer import Visualizer
 from report_generator import ReportGenerator
 from pdf_report_generator import PDFReportGenerator
+from result_cache import ResultCache
+from instrumentation import StageRecorder
+from validation import ValidationError
+from student import ATTENDANCE_LEVELS
+
+# DPI each rendered chart is rasterized at, per consumer
+PLOT_TARGETS = {'dashboard': 100, 'pdf': 300}
+# Bump whenever the shape of a cached result below changes, so stale entries are never unpickled
+CACHE_VERSION = 2
+
+
+@st.cache_resource
+def get_result_cache():
+    # One cache per process, shared by every session and rerun
+    return ResultCache("cache", version=CACHE_VERSION)
+
+
+@st.cache_resource(max_entries=8)
+def get_indexed_analyzer(digest, _df):
+    # Sorted indexes are built once per dataset; slider reruns only run binary searches
+    return Analyzer(_df).build_indexes()
+
+
+def load_frame(data):
+    # The upload buffer is parsed in place, with no temporary file per session
+    dataset = DatasetManager(data, columnar=True)
+    df = dataset.load_data()
+    # The report is cached with the frame so reruns can still show what was fixed up
+    return df, dataset.validation_report.to_dict()
+
+
+def render_reports(stats, charts, flagged=None, criteria=None):
+    # Both reports are built in memory, so concurrent sessions never share a file
+    text_report = ReportGenerator(stats).render()
+    # The PDF embeds the same chart bytes the dashboard shows, rasterized at print DPI
+    pdf_report = PDFReportGenerator(stats, scatter_path=charts['scatter_plot'], bar_path=charts['bar_chart'],
+                                    flagged=flagged, flagged_criteria=criteria).render_pdf()
+    return {'text': text_report, 'pdf': pdf_report}
+
 
 # Streamlit page setup
 st.set_page_config(page_title="Student Attendance Dashboard", layout="wide")
@@ -19,75 +57,102 @@ st.markdown("Analyze and visualize how student attendance affects performance"
 # File uploader
 uploaded_file = st.file_uploader("Upload Student Dataset (CSV format)", type=["csv"])
 
-if uploaded_file:
-    try:
-        # Save uploaded CSV temporarily
-        os.makedirs("data", exist_ok=True)
-        temp_path = os.path.join("data", "uploaded_students.csv")
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        # Load and analyze data
-        dataset = DatasetManager(temp_path)
-        students = dataset.load_data()
-    except ValueError as e:
-        st.error(f" {str(e)}")
-        st.info("Your CSV should have these columns: Student_ID, Name, Attendance, Average_Grade")
-        # Show sample CSV format
-        st.code("""
+# Optional per-stage timings; stages only record while the recorder is active
+show_timings = st.sidebar.checkbox("Show pipeline timings")
+track_memory = show_timings and st.sidebar.checkbox("Track peak memory (slower)")
+recorder = StageRecorder(trace_memory=track_memory) if show_timings else nullcontext()
+
+with recorder:
+    if uploaded_file:
+        cache = get_result_cache()
+        data = uploaded_file.getbuffer()
+        digest = cache.key_for(data)
+
+        try:
+            # Load and analyze data
+            df, validation = cache.get_or_compute(digest, "frame", lambda: load_frame(data))
+        except ValueError as e:
+            st.error(f" {str(e)}")
+            if isinstance(e, ValidationError):
+                st.json(e.report.to_dict())
+            st.info("Your CSV should have these columns: Student_ID, Name, Attendance, Average_Grade")
+            # Show sample CSV format
+            st.code("""
 Sample CSV format:
 Student_ID,Name,Attendance,Average_Grade
 1,John Doe,85,92.5
 2,Jane Smith,92,88.7
-        """.strip())
-        st.stop()  # Stop execution here
-
-    analyzer = Analyzer(students)
-    stats = analyzer.compute_statistics()
-
-    # Display data
-    st.subheader("Dataset Preview")
-    st.dataframe(analyzer.df.head())
-
-    st.subheader("Summary Statistics")
-    st.json(stats)
-
-    # Visualization
-    visualizer = Visualizer(analyzer.df)
-    visualizer.scatter_plot()
-    visualizer.bar_chart()
-
-    # Show plots inline
-    st.subheader("Scatter Plot: Attendance vs Performance")
-    fig1, ax1 = plt.subplots(figsize=(7, 5))
-    sns.scatterplot(data=analyzer.df, x='Attendance', y='Average_Grade', hue='Attendance_Level', s=100, ax=ax1)
-    plt.title("Attendance vs Performance")
-    st.pyplot(fig1)
-
-    st.subheader("Bar Chart: Average Grade by Attendance Category")
-    fig2, ax2 = plt.subplots(figsize=(7, 5))
-    avg_grades = analyzer.df.groupby('Attendance_Level')['Average_Grade'].mean()
-    sns.barplot(x=avg_grades.index, y=avg_grades.values, ax=ax2)
-    plt.title("Average Grade by Attendance Level")
-    st.pyplot(fig2)
-
-    # Generate reports
-    os.makedirs("reports", exist_ok=True)
-    text_report = ReportGenerator(stats)
-    text_path = text_report.generate()
-
-    pdf_report = PDFReportGenerator(stats)
-    pdf_path = pdf_report.generate_pdf()
-
-    # Download buttons
-    col1, col2 = st.columns(2)
-    with col1:
-        with open(text_path, "r") as f:
-            st.download_button("Download Text Report", f.read(), "summary_report.txt", "text/plain")
-    with col2:
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF Report", f.read(), "summary_report.pdf", "application/pdf")
-
-    st.success(" Full analysis and PDF report generated successfully!")
-else:
-    st.info("Please upload a CSV file to begin analysis.")
+            """.strip())
+            st.stop()  # Stop execution here
+
+        if validation['rules']:
+            with st.expander(f"Data issues found in {validation['rows_checked']} rows "
+                             f"({validation['rows_dropped']} dropped)"):
+                st.json(validation['rules'])
+
+        analyzer = get_indexed_analyzer(digest, df)
+        stats = cache.get_or_compute(digest, "stats", analyzer.compute_statistics)
+
+        # Display data
+        st.subheader("Dataset Preview")
+        st.dataframe(analyzer.df.head())
+
+        st.subheader("Summary Statistics")
+        st.json(stats)
+
+        # Visualization: each chart is drawn once and rasterized for screen and print
+        plots = cache.get_or_compute(digest, "plots", lambda: Visualizer(analyzer.df).render(PLOT_TARGETS))
+
+        # Show plots inline
+        st.subheader("Scatter Plot: Attendance vs Performance")
+        st.image(plots['dashboard']['scatter_plot'])
+
+        st.subheader("Bar Chart: Average Grade by Attendance Category")
+        st.image(plots['dashboard']['bar_chart'])
+
+        # Drill-down: sliders query the analyzer's sorted indexes instead of rescanning the frame
+        st.subheader("Find At-Risk Students")
+        low = min(0.0, stats['min_attendance'], stats['min_grade'])
+        high = max(100.0, stats['max_attendance'], stats['max_grade'])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            attendance_range = st.slider("Attendance (%)", low, high, (low, 80.0))
+        with col2:
+            grade_range = st.slider("Average Grade", low, high, (low, 60.0))
+        with col3:
+            level = st.selectbox("Attendance Level", ("All",) + ATTENDANCE_LEVELS)
+        flagged = analyzer.find_students(attendance_range, grade_range, None if level == "All" else level)
+        flagged = flagged.sort_values('Average_Grade', kind='stable')
+        criteria = (f"attendance {attendance_range[0]:g}-{attendance_range[1]:g}%, "
+                    f"grade {grade_range[0]:g}-{grade_range[1]:g}, level {level}")
+        st.caption(f"{len(flagged)} students match ({criteria}); lowest grades first")
+        st.dataframe(flagged.head(1000))
+
+        bottom_k = st.number_input("Lowest-graded students to list", 0, 1000, 10)
+        st.dataframe(analyzer.bottom_students(bottom_k))
+
+        # Generate reports; listing the flagged students is opt-in so slider moves never rebuild the PDF
+        if st.checkbox("List the flagged students in the PDF report"):
+            report_key = "reports-{:g}-{:g}-{:g}-{:g}-{}".format(*attendance_range, *grade_range, level)
+            reports = cache.get_or_compute(digest, report_key,
+                                           lambda: render_reports(stats, plots['pdf'], flagged, criteria))
+        else:
+            reports = cache.get_or_compute(digest, "reports", lambda: render_reports(stats, plots['pdf']))
+
+        # Download buttons
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Download Text Report", reports['text'], "summary_report.txt", "text/plain")
+        with col2:
+            st.download_button("Download PDF Report", reports['pdf'], "summary_report.pdf", "application/pdf")
+
+        st.success(" Full analysis and PDF report generated successfully!")
+    else:
+        st.info("Please upload a CSV file to begin analysis.")
+
+if show_timings:
+    st.sidebar.subheader("Pipeline Timings")
+    if recorder.records:
+        st.sidebar.dataframe(pd.DataFrame(recorder.records))
+    else:
+        st.sidebar.caption("No stages ran on this rerun; all results came from the cache.")
@@ -1,34 +1,303 @@
+import glob
+import io
+import os
+import numpy as np
 import pandas as pd
-from student import Student
+from student import StudentCollection, categorize_attendance_levels
+from columnar_store import is_store, open_store, write_store
+from stream_stats import StreamingStatistics
+from instrumentation import stage
+from validation import validate_frame
+from event_log import EVENT_COLUMNS, GRADE_COLUMNS, EventLogAggregator
+from file_merge import merge_files
+
+REQUIRED_COLUMNS = ['Student_ID', 'Name', 'Attendance', 'Average_Grade']
+# In-memory sources (e.g. an upload's getbuffer()) accepted in place of a file path
+BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+
+class _BufferReader(io.RawIOBase):
+    """Read-only file object over a bytes-like buffer that never copies it whole"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        size = min(len(b), len(self._view) - self._position)
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+
+class _RowHashSet:
+    """Set of 64-bit row hashes stored as a few sorted numpy arrays
+
+    Uses 8 bytes per distinct row. New hashes are merged like a binary
+    counter, so each one is re-sorted O(log n) times in total.
+    """
+
+    def __init__(self):
+        self.levels = []
+
+    def add(self, hashes):
+        """Add hashes and return a mask of those not seen before (first occurrence only)"""
+        unique, first = np.unique(np.asarray(hashes, dtype='uint64'), return_index=True)
+        seen = np.zeros(len(unique), dtype=bool)
+        for level in self.levels:
+            positions = np.minimum(np.searchsorted(level, unique), len(level) - 1)
+            seen |= level[positions] == unique
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first[~seen]] = True
+
+        new = unique[~seen]
+        while self.levels and len(self.levels[-1]) <= len(new):
+            # Levels never share a hash, so merging is a plain concatenate and sort
+            new = np.sort(np.concatenate([self.levels.pop(), new]))
+        if len(new):
+            self.levels.append(new)
+        return keep
+
 
 class DatasetManager:
-    def __init__(self, file_path):
+    def __init__(self, file_path, columnar=False, policies=None, conflict='latest', memory_budget=256 * 2**20):
+        # A path to a CSV file or columnar store, a bytes-like buffer holding CSV data,
+        # or a glob pattern / list of CSV paths to merge by Student_ID
         self.file_path = file_path
-        self.students = []
+        # How merged files resolve repeated IDs ('latest', 'max' or 'average') and their memory budget
+        self.conflict = conflict
+        self.memory_budget = memory_budget
+        # Per-rule validation policies ('reject', 'drop', 'impute' or 'allow'), see validation.py
+        self.policies = policies
+        self.validation_report = None
+        self.event_summary = None
+        # Columnar mode keeps the data in pandas columns and skips per-row Student objects
+        self.columnar = columnar
+        self.df = None
+        self._students = StudentCollection([], [], [], [])
+
+    @property
+    def students(self):
+        # The student collection is only built on demand in columnar mode
+        if self._students is None:
+            self._students = StudentCollection.from_frame(self.df)
+        return self._students
 
     def load_data(self):
+        if isinstance(self.file_path, (list, tuple)) or (isinstance(self.file_path, str)
+                                                        and glob.has_magic(self.file_path)):
+            return self._load_merged()
+        if not isinstance(self.file_path, BUFFER_TYPES) and is_store(self.file_path):
+            return self._load_store()
         try:
-            df = pd.read_csv(self.file_path)
-            required_columns = ['Student_ID', 'Name', 'Attendance', 'Average_Grade']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            with stage('load') as load_stage:
+                df = pd.read_csv(self._source())
+                load_stage.rows = len(df)
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
             
             if missing_columns:
                 raise ValueError(f"Missing required columns in CSV: {', '.join(missing_columns)}")
             
+            return self._clean(df)
+        except pd.errors.EmptyDataError:
+            raise ValueError("The uploaded CSV file is empty")
+        except pd.errors.ParserError as e:
+            raise ValueError(f"Error parsing CSV file: {str(e)}")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error loading data: {str(e)}")
+
+    def load_events(self, grades_path, chunksize=1_000_000):
+        """Load a long-format attendance event log plus grade records
+
+        file_path holds one row per session (Student_ID, Status and optionally
+        Name/Date) and grades_path one row per grade (Student_ID, Grade). Both
+        are read in chunks and reduced to per-student attendance percentages and
+        average grades, which then go through the same cleaning as load_data.
+        Events with a blank Status and students with grades but no sessions are
+        left out; their counts are kept on self.event_summary.
+        """
+        aggregator = EventLogAggregator()
+        try:
+            with stage('load') as load_stage:
+                # Status stays text so '1'/'0' and blanks are never reinterpreted as floats
+                for chunk in _read_chunks(self._source(), EVENT_COLUMNS, chunksize, dtype={'Status': str}):
+                    aggregator.add_events(chunk)
+                for chunk in _read_chunks(grades_path, GRADE_COLUMNS, chunksize):
+                    aggregator.add_grades(chunk)
+                load_stage.rows = aggregator.events + aggregator.grade_records
+            df = aggregator.to_frame()
+            self.event_summary = aggregator.summary()
+            return self._clean(df, line_numbers=False)
+        except pd.errors.EmptyDataError:
+            raise ValueError("The event log or grade records file is empty")
+        except pd.errors.ParserError as e:
+            raise ValueError(f"Error parsing CSV file: {str(e)}")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error loading data: {str(e)}")
+
+    def _load_merged(self):
+        try:
+            with stage('load') as load_stage:
+                df = merge_files(self.file_path, self.conflict, self.memory_budget)
+                load_stage.rows = len(df)
+        except OSError as e:
+            raise ValueError(f"Error loading data: {str(e)}")
+        # Merged rows come from several files, so there is no single CSV line to point at
+        return self._clean(df, line_numbers=False)
+
+    def _clean(self, df, line_numbers=True):
+        with stage('clean') as clean_stage:
             df = df.drop_duplicates()
-            # Only fill numeric columns with their mean
-            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
-            for col in numeric_cols:
-                df[col] = df[col].fillna(df[col].mean())
-            
-            for _, row in df.iterrows():
-                student = Student(row['Student_ID'], row['Name'], row['Attendance'], row['Average_Grade'])
-                self.students.append(student)
-            return self.students
+            df, self.validation_report = validate_frame(df, self.policies, line_numbers=line_numbers)
+            # Only the measures are ever imputed (per the rule policies); other columns such as
+            # Class or Term keep their missing values so they group as their own key
+
+            if self.columnar:
+                self.df = to_analysis_frame(df)
+                self._students = None
+            else:
+                self._students = StudentCollection(df['Student_ID'].to_numpy(), df['Name'].to_numpy(),
+                                                   df['Attendance'].to_numpy(dtype='float64'),
+                                                   df['Average_Grade'].to_numpy(dtype='float64'))
+            clean_stage.rows = len(df)
+        return self.df if self.columnar else self._students
+
+    def import_store(self, store_path):
+        """Validate the CSV once and convert it into a memory-mappable columnar store"""
+        df = DatasetManager(self.file_path, columnar=True).load_data()
+        return write_store(df, store_path)
+
+    def _source(self):
+        """What pd.read_csv should read: the path itself, or a reader over the buffer"""
+        if isinstance(self.file_path, BUFFER_TYPES):
+            return io.BufferedReader(_BufferReader(self.file_path))
+        return self.file_path
+
+    def _load_store(self):
+        try:
+            with stage('load') as load_stage:
+                self.df = open_store(self.file_path)
+                load_stage.rows = len(self.df)
+        except (OSError, KeyError) as e:
+            raise ValueError(f"Error opening columnar store: {str(e)}")
+        self._students = None
+        if self.columnar:
+            return self.df
+        return self.students
+
+    @property
+    def stats_path(self):
+        """Where the persisted sufficient statistics for this dataset live"""
+        return f"{os.path.splitext(self.file_path)[0]}.stats.json"
+
+    def load_statistics(self, chunksize=100_000, deduplicate=False):
+        """Return the dataset's persisted StreamingStatistics state
+
+        If no state exists yet, it is built once with a chunked pass over the CSV
+        and saved next to it. See iter_chunks for what deduplicate costs.
+        """
+        if os.path.exists(self.stats_path):
+            return StreamingStatistics.load(self.stats_path)
+        state = StreamingStatistics()
+        if os.path.exists(self.file_path):
+            for chunk in self.iter_chunks(chunksize, deduplicate):
+                state.update_frame(chunk)
+        state.save(self.stats_path)
+        return state
+
+    def append_data(self, source, chunksize=100_000):
+        """Append new rows to the dataset and update its persisted statistics
+
+        source is a CSV path or a DataFrame with the required columns. Only the
+        new rows are read, so the cost is O(new rows). Appended rows are not
+        deduplicated against the existing history. Returns the updated state.
+        """
+        state = self.load_statistics(chunksize)
+        if isinstance(source, pd.DataFrame):
+            chunks = [validate_chunk(source.copy())]
+        else:
+            chunks = DatasetManager(source).iter_chunks(chunksize, deduplicate=False)
+
+        write_header = not os.path.exists(self.file_path)
+        columns = None if write_header else pd.read_csv(self.file_path, nrows=0).columns
+        for chunk in chunks:
+            state.update_frame(chunk)
+            if columns is None:
+                columns = chunk.columns
+            chunk.reindex(columns=columns).to_csv(self.file_path, mode="a", header=write_header, index=False)
+            write_header = False
+        state.save(self.stats_path)
+        return state
+
+    def iter_chunks(self, chunksize=100_000, deduplicate=False):
+        """Yield the CSV as validated, bounded-size DataFrame chunks
+
+        Attendance and Average_Grade are coerced to numbers but missing values are
+        left in place, since the mean fill needs the whole file. Unlike load_data,
+        whole-row duplicates are kept by default, so memory stays bounded by the
+        chunk size. With deduplicate=True they are dropped across chunks using
+        sorted arrays of 64-bit row hashes, which cost 8 bytes per distinct row.
+        """
+        seen = _RowHashSet()
+        try:
+            for chunk in pd.read_csv(self._source(), chunksize=chunksize):
+                chunk = validate_chunk(chunk)
+                if deduplicate:
+                    chunk = chunk.drop_duplicates()
+                    # Chunks infer dtypes independently, so align ints and floats before hashing
+                    numeric_cols = chunk.select_dtypes(include='number').columns
+                    aligned = chunk.astype(dict.fromkeys(numeric_cols, 'float64'))
+                    hashes = pd.util.hash_pandas_object(aligned, index=False).to_numpy()
+                    chunk = chunk[seen.add(hashes)]
+                yield chunk
         except pd.errors.EmptyDataError:
             raise ValueError("The uploaded CSV file is empty")
         except pd.errors.ParserError as e:
             raise ValueError(f"Error parsing CSV file: {str(e)}")
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Error loading data: {str(e)}")
 
+
+def validate_chunk(chunk):
+    """Check a raw chunk for the required columns and coerce the numeric ones"""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns in CSV: {', '.join(missing_columns)}")
+
+    for col in ('Attendance', 'Average_Grade'):
+        chunk[col] = pd.to_numeric(chunk[col])
+    return chunk
+
+
+def _read_chunks(source, columns, chunksize, dtype=None):
+    """Read only the columns an event source needs (plus Name, if present) in chunks"""
+    wanted = set(columns) | {'Name'}
+    return pd.read_csv(source, chunksize=chunksize, usecols=lambda col: col in wanted, dtype=dtype)
+
+
+def to_analysis_frame(df):
+    """Build the Analyzer frame from a cleaned dataset frame without per-row objects
+
+    Columns beyond the required ones (e.g. Class or Term) are carried through
+    so they can be used as grouping columns.
+    """
+    data = {
+        'ID': df['Student_ID'].to_numpy(),
+        'Name': df['Name'].to_numpy(),
+        'Attendance': df['Attendance'].to_numpy(),
+        'Average_Grade': df['Average_Grade'].to_numpy(),
+        'Attendance_Level': categorize_attendance_levels(df['Attendance'].to_numpy())
+    }
+    for col in df.columns:
+        if col not in REQUIRED_COLUMNS and col not in data:
+            data[col] = df[col].to_numpy()
+    return pd.DataFrame(data)
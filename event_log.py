@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+# Only these are read; other columns such as Date are skipped while parsing
+EVENT_COLUMNS = ['Student_ID', 'Status']
+GRADE_COLUMNS = ['Student_ID', 'Grade']
+# Accepted spellings of a session's status, after lower-casing
+STATUS_VALUES = {
+    'present': 1, 'p': 1, '1': 1, 'true': 1, 'yes': 1,
+    'absent': 0, 'a': 0, '0': 0, 'false': 0, 'no': 0,
+}
+
+
+class EventLogAggregator:
+    """Reduce long-format attendance events and grade records to one row per student
+
+    Chunks are folded into per-student running sums as they arrive: each chunk's
+    IDs are factorized, summed with np.bincount and scattered into arrays indexed
+    by a global student position. Memory grows with the number of students, never
+    with the number of events. Every event row counts as one session.
+    """
+
+    def __init__(self):
+        self.ids = pd.Index([])
+        self.names = np.empty(0, dtype=object)
+        self.sessions = np.zeros(0, dtype='int64')
+        self.present = np.zeros(0, dtype='int64')
+        self.grade_sum = np.zeros(0, dtype='float64')
+        self.grade_count = np.zeros(0, dtype='int64')
+        self.events = 0
+        self.blank_statuses = 0
+        self.grade_records = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _positions(self, chunk):
+        """Factorize the chunk's IDs and map each unique one to its global position"""
+        codes, uniques = pd.factorize(chunk['Student_ID'])
+        if (codes < 0).any():
+            raise ValueError("Event log has rows without a Student_ID")
+        positions = self.ids.get_indexer(uniques)
+        new = positions < 0
+        if new.any():
+            positions[new] = np.arange(len(self.ids), len(self.ids) + int(new.sum()))
+            self.ids = self.ids.append(pd.Index(uniques[new]))
+            self._grow(len(self.ids))
+            if 'Name' in chunk.columns:
+                # factorize numbers uniques by first appearance, so reversed assignment keeps the first row
+                first = np.empty(len(uniques), dtype='int64')
+                first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+                self.names[positions[new]] = chunk['Name'].to_numpy()[first[new]]
+        return codes, positions
+
+    def _grow(self, size):
+        extra = size - len(self.sessions)
+        self.names = np.concatenate([self.names, np.full(extra, None, dtype=object)])
+        self.sessions = np.concatenate([self.sessions, np.zeros(extra, dtype='int64')])
+        self.present = np.concatenate([self.present, np.zeros(extra, dtype='int64')])
+        self.grade_sum = np.concatenate([self.grade_sum, np.zeros(extra, dtype='float64')])
+        self.grade_count = np.concatenate([self.grade_count, np.zeros(extra, dtype='int64')])
+
+    def add_events(self, chunk):
+        """Fold a chunk of (Student_ID, Status[, Name]) attendance events"""
+        _require(chunk, EVENT_COLUMNS, "attendance event log")
+        self.events += len(chunk)
+        text = chunk['Status'].str.strip().str.lower()
+        # A blank status records no session; count it rather than guess present or absent
+        blank = (text.isna() | (text == '')).to_numpy()
+        if blank.any():
+            self.blank_statuses += int(blank.sum())
+            chunk, text = chunk[~blank], text[~blank]
+        status = text.map(STATUS_VALUES)
+        unknown = status.isna()
+        if unknown.any():
+            values = ", ".join(sorted(chunk.loc[unknown, 'Status'].astype(str).unique())[:5])
+            raise ValueError(f"Unrecognized attendance status values: {values}")
+
+        codes, positions = self._positions(chunk)
+        size = len(positions)
+        self.sessions[positions] += np.bincount(codes, minlength=size)
+        self.present[positions] += np.bincount(codes, weights=status.to_numpy(dtype='float64'),
+                                               minlength=size).astype('int64')
+        return self
+
+    def add_grades(self, chunk):
+        """Fold a chunk of (Student_ID, Grade[, Name]) grade records; missing grades are skipped"""
+        _require(chunk, GRADE_COLUMNS, "grade records")
+        grades = pd.to_numeric(chunk['Grade']).to_numpy(dtype='float64')
+        recorded = ~np.isnan(grades)
+        codes, positions = self._positions(chunk)
+        size = len(positions)
+        self.grade_sum[positions] += np.bincount(codes[recorded], weights=grades[recorded], minlength=size)
+        self.grade_count[positions] += np.bincount(codes[recorded], minlength=size)
+        self.grade_records += len(chunk)
+        return self
+
+    def to_frame(self):
+        """One row per student with at least one session, as DatasetManager.load_data expects
+
+        Students who only appear in the grade records are left out, since
+        there is no attendance figure for them (see summary). Students with
+        sessions but no grades get a NaN grade, which the validation stage
+        handles according to its 'missing' policy.
+        """
+        attended = self.sessions > 0
+        sessions = self.sessions[attended]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average_grade = np.where(self.grade_count > 0, self.grade_sum / self.grade_count, np.nan)[attended]
+        ids = self.ids.to_numpy()[attended]
+        names = self.names[attended]
+        unnamed = pd.isna(names)
+        names[unnamed] = ids[unnamed].astype(str)
+        return pd.DataFrame({
+            'Student_ID': ids,
+            'Name': names,
+            'Attendance': 100.0 * self.present[attended] / sessions,
+            'Average_Grade': average_grade,
+        })
+
+    def summary(self):
+        """Counts of what was read and of what to_frame leaves out"""
+        return {
+            'events': self.events,
+            'blank_statuses': self.blank_statuses,
+            'grade_records': self.grade_records,
+            'students': int((self.sessions > 0).sum()),
+            'students_without_sessions': int((self.sessions == 0).sum()),
+        }
+
+
+def _require(chunk, columns, label):
+    missing_columns = [col for col in columns if col not in chunk.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns in {label}: {', '.join(missing_columns)}")
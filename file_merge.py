@@ -0,0 +1,112 @@
+import glob
+import math
+import os
+import pickle
+import tempfile
+import pandas as pd
+
+CONFLICT_RULES = ('latest', 'max', 'average')
+MERGED_COLUMNS = ['Attendance', 'Average_Grade']
+# Parsed frames take a few times their CSV size in memory; used to size partitions
+MEMORY_PER_CSV_BYTE = 4
+
+
+def expand_sources(sources):
+    """Turn a glob pattern or a list of paths/patterns into an ordered list of files
+
+    Files matched by one pattern are taken in name order, so for 'latest' the
+    later name wins (e.g. term1.csv, term2.csv).
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    paths = []
+    for source in sources:
+        matches = sorted(glob.glob(source)) if glob.has_magic(source) else [source]
+        if not matches:
+            raise ValueError(f"No files match {source}")
+        paths.extend(matches)
+    return paths
+
+
+def merge_files(sources, conflict='latest', memory_budget=256 * 2**20, chunksize=100_000, spill_dir=None):
+    """Merge several student CSVs into one row per Student_ID
+
+    conflict decides what happens when an ID appears more than once: 'latest'
+    keeps the row from the last file (and last line), 'max' and 'average'
+    combine Attendance and Average_Grade and take the other columns from the
+    latest row. Rows without an ID cannot be matched and are kept as they are.
+
+    Input is read in chunks. If the estimated parsed size exceeds memory_budget,
+    rows are hash-partitioned by Student_ID into spill files and each partition
+    is resolved on its own, so peak memory stays near memory_budget plus the
+    merged result.
+    """
+    if conflict not in CONFLICT_RULES:
+        raise ValueError(f"Unknown conflict rule '{conflict}', expected one of: {', '.join(CONFLICT_RULES)}")
+    # Imported here since DatasetManager itself dispatches to this module
+    from dataset_manager import DatasetManager
+
+    paths = expand_sources(sources)
+    estimate = sum(os.path.getsize(path) for path in paths) * MEMORY_PER_CSV_BYTE
+    partitions = max(1, math.ceil(estimate / memory_budget))
+
+    def tagged_chunks():
+        offset = 0
+        for path in paths:
+            for chunk in DatasetManager(path).iter_chunks(chunksize, deduplicate=False):
+                # A global row sequence number decides what 'latest' means
+                chunk['_order'] = range(offset, offset + len(chunk))
+                offset += len(chunk)
+                yield chunk
+
+    if partitions == 1:
+        frames = list(tagged_chunks())
+        return _finish([_resolve(pd.concat(frames, ignore_index=True), conflict)] if frames else [])
+
+    with tempfile.TemporaryDirectory(prefix="merge-", dir=spill_dir) as tmp:
+        spill_paths = [os.path.join(tmp, f"partition_{index}.pkl") for index in range(partitions)]
+        for chunk in tagged_chunks():
+            keys = _partition_keys(chunk['Student_ID'], partitions)
+            for index, part in chunk.groupby(keys, sort=False):
+                with open(spill_paths[index], "ab") as f:
+                    pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return _finish([_resolve(pd.concat(_read_spill(path), ignore_index=True), conflict)
+                        for path in spill_paths if os.path.exists(path)])
+
+
+def _partition_keys(ids, partitions):
+    # Chunks infer dtypes independently, so hash numeric IDs as floats (1 and 1.0 must agree)
+    if pd.api.types.is_numeric_dtype(ids):
+        ids = ids.astype('float64')
+    else:
+        ids = ids.astype(str)
+    return pd.util.hash_pandas_object(ids, index=False).to_numpy() % partitions
+
+
+def _read_spill(path):
+    frames = []
+    with open(path, "rb") as f:
+        while True:
+            try:
+                frames.append(pickle.load(f))
+            except EOFError:
+                return frames
+
+
+def _resolve(df, conflict):
+    """Collapse one partition to a single row per Student_ID"""
+    unmatched = df[df['Student_ID'].isna()]
+    df = df[df['Student_ID'].notna()].sort_values('_order', kind='stable')
+    latest = df.drop_duplicates('Student_ID', keep='last')
+    if conflict != 'latest':
+        combined = df.groupby('Student_ID', sort=False)[MERGED_COLUMNS].agg('max' if conflict == 'max' else 'mean')
+        latest = latest.copy()
+        latest[MERGED_COLUMNS] = combined.loc[latest['Student_ID'], MERGED_COLUMNS].to_numpy()
+    return pd.concat([latest, unmatched])
+
+
+def _finish(resolved):
+    if not resolved:
+        raise ValueError("The uploaded CSV file is empty")
+    merged = pd.concat(resolved, ignore_index=True).sort_values('_order', kind='stable')
+    return merged.drop(columns='_order').reset_index(drop=True)
@@ -0,0 +1,163 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger("students_performance.instrumentation")
+
+# Recorder collecting stages for the current request; None means instrumentation is off
+_active_recorder = contextvars.ContextVar("active_recorder", default=None)
+
+# tracemalloc is process-wide: recorders share it through a reference count, and
+# only a recorder tracing alone may reset the peak counter
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_owns_tracing = False
+
+
+def _start_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _owns_tracing = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+
+def _reset_peak():
+    """Reset the peak counter if no other recorder is tracing; returns whether it did"""
+    with _tracing_lock:
+        if _tracing_users == 1:
+            tracemalloc.reset_peak()
+            return True
+        return False
+
+
+def _shared_tracing():
+    with _tracing_lock:
+        return _tracing_users > 1
+
+
+class _NullStage:
+    """Shared stand-in returned by stage() when nothing is recording"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass  # Callers may still set .rows; there is nothing to record it on
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, recorder, name, rows):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.recorder._enter(self)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self.recorder._exit(self, wall, cpu, failed=exc_type is not None)
+        return False
+
+
+class StageRecorder:
+    """Collects wall time, CPU time, row counts and peak memory for pipeline stages
+
+    Use as a context manager around a request; stage() calls made inside it
+    (including inside DatasetManager, Analyzer, Visualizer and the report
+    generators) are recorded here. Peak memory is only measured with
+    trace_memory=True, since tracemalloc slows down allocation. tracemalloc is
+    process-wide, so while several recorders trace memory at once (e.g.
+    concurrent Streamlit sessions) a stage's peak_bytes also counts the other
+    sessions' allocations; such records carry peak_shared=True. With log=True
+    every finished stage is also emitted as a JSON log line.
+    """
+
+    def __init__(self, trace_memory=False, log=True):
+        self.trace_memory = trace_memory
+        self.log = log
+        self.records = []
+        # [stage, peak_bytes, start_bytes, peak_shared] for stages currently running
+        self._stack = []
+        self._token = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            _start_tracing()
+        self._token = _active_recorder.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active_recorder.reset(self._token)
+        if self.trace_memory:
+            _stop_tracing()
+        return False
+
+    def _enter(self, stage):
+        if self.trace_memory:
+            # Fold the peak so far into the enclosing stage before restarting the peak counter
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], tracemalloc.get_traced_memory()[1])
+            shared = not _reset_peak()
+            self._stack.append([stage, 0, tracemalloc.get_traced_memory()[0], shared])
+        else:
+            self._stack.append([stage, 0, 0, False])
+
+    def _exit(self, stage, wall, cpu, failed):
+        _, peak, start, shared = self._stack.pop()
+        record = {
+            'stage': stage.name,
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(cpu, 6),
+            'rows': stage.rows,
+        }
+        if self.trace_memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            # Reported relative to what was already allocated when the stage began
+            record['peak_bytes'] = max(peak - start, 0)
+            if shared or _shared_tracing():
+                record['peak_shared'] = True
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+                self._stack[-1][3] = self._stack[-1][3] or shared
+        if failed:
+            record['failed'] = True
+        self.records.append(record)
+        if self.log:
+            logger.info(json.dumps({'event': 'pipeline_stage', **record}))
+
+
+def stage(name, rows=None):
+    """Context manager timing one pipeline stage; a shared no-op when not recording
+
+    Set .rows on the returned object once the row count is known.
+    """
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name, rows)
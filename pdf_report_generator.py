@@ -5,54 +5,151 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
 from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+import copy
+import io
 import os
 
+from instrumentation import stage
+
+RECOMMENDATIONS = [
+    "Based on the analysis, we recommend the following actions:",
+    "• Monitor and Support: Identify students with attendance below 80% for early intervention.",
+    "• Recognition Program: Implement rewards for students maintaining high attendance rates.",
+    "• Attendance Tracking: Set up a system to track attendance patterns and trigger alerts.",
+    "• Student Engagement: Develop strategies to make classes more engaging and interactive.",
+    "• Communication: Regular updates to stakeholders about attendance-performance correlation.",
+    "• Resource Access: Ensure students have necessary resources for consistent attendance.",
+]
+# Longest flagged-student list printed in the report; the rest are summarized in one line
+MAX_FLAGGED_ROWS = 200
+
+
+@lru_cache(maxsize=None)
+def report_styles():
+    """Stylesheet with the report's custom styles, built once per process"""
+    styles = getSampleStyleSheet()
+
+    # Compact custom styles for 2-page layout
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=14,
+        spaceAfter=10,
+        leading=16
+    ))
+    styles.add(ParagraphStyle(
+        name='SectionTitle',
+        parent=styles['Heading2'],
+        fontSize=12,
+        spaceAfter=6,
+        spaceBefore=6,
+        leading=14
+    ))
+    styles.add(ParagraphStyle(
+        name='CompactNormal',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=11,
+        spaceBefore=2,
+        spaceAfter=2
+    ))
+    styles.add(ParagraphStyle(
+        name='TableHeader',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=11,
+        textColor=colors.whitesmoke
+    ))
+    styles.add(ParagraphStyle(
+        name='TableCell',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=11
+    ))
+
+    # Section and chart styles used by the visualizations page
+    styles.add(ParagraphStyle(
+        name='VizHeader',
+        parent=styles['SectionTitle'],
+        spaceBefore=10,
+        spaceAfter=10,
+        fontSize=12,
+        textColor=colors.HexColor('#2C3E50')
+    ))
+    styles.add(ParagraphStyle(
+        name='ScatterHeader',
+        parent=styles['Heading3'],
+        spaceBefore=6,
+        spaceAfter=6,
+        fontSize=10,
+        textColor=colors.HexColor('#34495E')
+    ))
+    styles.add(ParagraphStyle(
+        name='PlotDescription',
+        parent=styles['CompactNormal'],
+        spaceBefore=4,
+        spaceAfter=10,
+        fontSize=9,
+        leading=11,
+        alignment=4  # Justified alignment
+    ))
+    styles.add(ParagraphStyle(
+        name='BarHeader',
+        parent=styles['Heading3'],
+        spaceBefore=60,  # Match the top spacing of the previous page
+        spaceAfter=20,
+        fontSize=12,
+        textColor=colors.HexColor('#34495E'),
+        leading=14
+    ))
+    return styles
+
+
+@lru_cache(maxsize=None)
+def _stats_table_style():
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ('TOPPADDING', (0, 1), (-1, -1), 4),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _recommendation_flowables():
+    # Paragraph parsing is the costly part; render_pdf lays out shallow copies
+    styles = report_styles()
+    flowables = [Paragraph("3. Recommendations", styles['SectionTitle'])]
+    for rec in RECOMMENDATIONS:
+        flowables.append(Paragraph(rec, styles['Normal']))
+        flowables.append(Spacer(1, 10))
+    return tuple(flowables)
+
+
 class PDFReportGenerator:
-    def __init__(self, stats, scatter_path="reports/scatter_plot.png", bar_path="reports/bar_chart.png"):
+    def __init__(self, stats, scatter_path="reports/scatter_plot.png", bar_path="reports/bar_chart.png",
+                 flagged=None, flagged_criteria=None):
         self.stats = stats
         self.scatter_path = scatter_path
         self.bar_path = bar_path
-        self.styles = getSampleStyleSheet()
+        # Optional analysis frame of flagged students (e.g. Analyzer.find_students) and how they were chosen
+        self.flagged = flagged
+        self.flagged_criteria = flagged_criteria
+        self.styles = report_styles()
         self.width, self.height = A4
-        os.makedirs("reports", exist_ok=True)
-        
-        # Compact custom styles for 2-page layout
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=14,
-            spaceAfter=10,
-            leading=16
-        ))
-        self.styles.add(ParagraphStyle(
-            name='SectionTitle',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=6,
-            spaceBefore=6,
-            leading=14
-        ))
-        self.styles.add(ParagraphStyle(
-            name='CompactNormal',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            leading=11,
-            spaceBefore=2,
-            spaceAfter=2
-        ))
-        self.styles.add(ParagraphStyle(
-            name='TableHeader',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            leading=11,
-            textColor=colors.whitesmoke
-        ))
-        self.styles.add(ParagraphStyle(
-            name='TableCell',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            leading=11
-        ))
 
     def _create_stats_table(self):
         """Create a compact formatted table of statistics"""
@@ -74,25 +171,41 @@ class PDFReportGenerator:
         
         # Create compact table
         table = Table(data, colWidths=[250, 150])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-            ('TOPPADDING', (0, 0), (-1, 0), 6),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-            ('TOPPADDING', (0, 1), (-1, -1), 4),
-        ]))
+        table.setStyle(_stats_table_style())
         return table
 
+    def _flagged_flowables(self):
+        """Section listing the flagged students, capped at MAX_FLAGGED_ROWS rows"""
+        count = len(self.flagged)
+        flowables = [PageBreak(), Paragraph("4. Flagged Students", self.styles['SectionTitle'])]
+        if self.flagged_criteria:
+            flowables.append(Paragraph(f"Criteria: {escape(str(self.flagged_criteria))}", self.styles['CompactNormal']))
+        if count == 0:
+            flowables.append(Paragraph("No students match the criteria.", self.styles['CompactNormal']))
+            return flowables
+        if count > MAX_FLAGGED_ROWS:
+            flowables.append(Paragraph(f"Showing the first {MAX_FLAGGED_ROWS} of {count} flagged students.",
+                                       self.styles['CompactNormal']))
+        flowables.append(Spacer(1, 6))
+
+        data = [['ID', 'Name', 'Attendance (%)', 'Average Grade', 'Level']]
+        shown = self.flagged.head(MAX_FLAGGED_ROWS)
+        for row in zip(shown['ID'], shown['Name'], shown['Attendance'], shown['Average_Grade'],
+                       shown['Attendance_Level']):
+            data.append([str(row[0]), str(row[1]), f"{row[2]:.1f}", f"{row[3]:.1f}", str(row[4])])
+        # repeatRows keeps the header on every page of a long list
+        table = Table(data, colWidths=[70, 190, 90, 90, 70], repeatRows=1)
+        table.setStyle(_stats_table_style())
+        flowables.append(table)
+        return flowables
+
+    @staticmethod
+    def _image_source(source):
+        """Chart images may be given as a file path or as in-memory PNG bytes"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return io.BytesIO(source)
+        return source if source and os.path.exists(source) else None
+
     def _get_correlation_insight(self):
         """Generate insight text based on correlation value"""
         corr = self.stats.get('correlation', 0)
@@ -107,11 +220,15 @@ class PDFReportGenerator:
         return f"There is a {strength} {direction} correlation ({corr:.3f}) between attendance and grades, " \
                f"suggesting that {'higher attendance tends to be associated with better grades' if corr > 0 else 'the relationship between attendance and grades needs further investigation'}."
 
-    def generate_pdf(self):
-        """Generate a compact two-page PDF report"""
-        pdf_path = "reports/summary_report.pdf"
+    def render_pdf(self):
+        """Build the compact two-page PDF report in memory and return its bytes"""
+        with stage('pdf'):
+            return self._build_pdf()
+
+    def _build_pdf(self):
+        buffer = io.BytesIO()
         doc = SimpleDocTemplate(
-            pdf_path,
+            buffer,
             pagesize=A4,
             rightMargin=36,  # Reduced margins
             leftMargin=36,
@@ -149,33 +266,18 @@ class PDFReportGenerator:
         story.append(PageBreak())
         
         # Create visualization section header
-        viz_header = ParagraphStyle(
-            'VizHeader',
-            parent=self.styles['SectionTitle'],
-            spaceBefore=10,
-            spaceAfter=10,
-            fontSize=12,
-            textColor=colors.HexColor('#2C3E50')
-        )
-        story.append(Paragraph("2. Data Visualizations", viz_header))
+        story.append(Paragraph("2. Data Visualizations", self.styles['VizHeader']))
         
         # Calculate available width for compact layout
         available_width = doc.width * 0.98  # Use more width
         
-        if os.path.exists(self.scatter_path):
+        scatter_image = self._image_source(self.scatter_path)
+        if scatter_image is not None:
             # Compact scatter plot section
-            scatter_style = ParagraphStyle(
-                'ScatterHeader',
-                parent=self.styles['Heading3'],
-                spaceBefore=6,
-                spaceAfter=6,
-                fontSize=10,
-                textColor=colors.HexColor('#34495E')
-            )
-            story.append(Paragraph("Attendance vs Performance Scatter Plot:", scatter_style))
+            story.append(Paragraph("Attendance vs Performance Scatter Plot:", self.styles['ScatterHeader']))
             
             # Add the image with compact sizing
-            img = Image(self.scatter_path)
+            img = Image(scatter_image)
             # Scale image to fit width while maintaining aspect ratio
             aspect = img.imageHeight / float(img.imageWidth)
             img.drawWidth = available_width
@@ -183,43 +285,24 @@ class PDFReportGenerator:
             story.append(img)
             story.append(Spacer(1, 6))
             
-            # Compact description style
-            desc_style = ParagraphStyle(
-                'PlotDescription',
-                parent=self.styles['CompactNormal'],
-                spaceBefore=4,
-                spaceAfter=10,
-                fontSize=9,
-                leading=11,
-                alignment=4  # Justified alignment
-            )
-            
             scatter_desc = Paragraph(
                 "This scatter plot shows the relationship between student attendance and their academic performance. "
                 "Each point represents a student, with colors indicating their attendance level category. "
                 "The pattern suggests a positive correlation between attendance and grades.",
-                desc_style
+                self.styles['PlotDescription']
             )
             story.append(scatter_desc)
             story.append(Spacer(1, 20))
         
-        if os.path.exists(self.bar_path):
+        bar_image = self._image_source(self.bar_path)
+        if bar_image is not None:
             story.append(PageBreak())  # Start bar chart on new page
             
             # Add bar chart section with consistent styling
-            bar_style = ParagraphStyle(
-                'BarHeader',
-                parent=self.styles['Heading3'],
-                spaceBefore=60,  # Match the top spacing of the previous page
-                spaceAfter=20,
-                fontSize=12,
-                textColor=colors.HexColor('#34495E'),
-                leading=14
-            )
-            story.append(Paragraph("Average Grade by Attendance Level:", bar_style))
+            story.append(Paragraph("Average Grade by Attendance Level:", self.styles['BarHeader']))
             
             # Add the bar chart image
-            img = Image(self.bar_path)
+            img = Image(bar_image)
             aspect = img.imageHeight / float(img.imageWidth)
             img.drawWidth = available_width * 0.9
             img.drawHeight = (available_width * 0.9) * aspect
@@ -236,20 +319,19 @@ class PDFReportGenerator:
             story.append(bar_desc)
         
         # 3. Recommendations Section
-        story.append(Paragraph("3. Recommendations", self.styles['SectionTitle']))
-        recommendations = [
-            "Based on the analysis, we recommend the following actions:",
-            "• Monitor and Support: Identify students with attendance below 80% for early intervention.",
-            "• Recognition Program: Implement rewards for students maintaining high attendance rates.",
-            "• Attendance Tracking: Set up a system to track attendance patterns and trigger alerts.",
-            "• Student Engagement: Develop strategies to make classes more engaging and interactive.",
-            "• Communication: Regular updates to stakeholders about attendance-performance correlation.",
-            "• Resource Access: Ensure students have necessary resources for consistent attendance.",
-        ]
-        for rec in recommendations:
-            story.append(Paragraph(rec, self.styles['Normal']))
-            story.append(Spacer(1, 10))
+        story.extend(copy.copy(flowable) for flowable in _recommendation_flowables())
+
+        # 4. Flagged Students Section
+        if self.flagged is not None:
+            story.extend(self._flagged_flowables())
             
         # Build PDF
         doc.build(story)
+        return buffer.getvalue()
+
+    def generate_pdf(self, pdf_path="reports/summary_report.pdf"):
+        """Generate a compact two-page PDF report"""
+        os.makedirs(os.path.dirname(pdf_path) or ".", exist_ok=True)
+        with open(pdf_path, "wb") as f:
+            f.write(self.render_pdf())
         return pdf_path
@@ -0,0 +1,175 @@
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+import io
+import os
+import re
+import time
+import zipfile
+
+from pdf_report_generator import report_styles
+
+
+@lru_cache(maxsize=None)
+def _card_table_style():
+    """Table style for report cards, built once per process"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ])
+
+
+def render_report_card(student, stats, generated_on):
+    """Render one student's report card and return the PDF bytes
+
+    student is an (ID, Name, Attendance, Average_Grade, Attendance_Level) tuple.
+    """
+    student_id, name, attendance, grade, level = student
+    styles = report_styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
+
+    data = [
+        ['Metric', 'Student', 'Cohort Mean', 'Cohort Min', 'Cohort Max', 'vs Mean'],
+        ['Attendance (%)', f"{attendance:.2f}", f"{stats['mean_attendance']:.2f}",
+         f"{stats['min_attendance']:.2f}", f"{stats['max_attendance']:.2f}",
+         f"{attendance - stats['mean_attendance']:+.2f}"],
+        ['Average Grade', f"{grade:.2f}", f"{stats['mean_grade']:.2f}",
+         f"{stats['min_grade']:.2f}", f"{stats['max_grade']:.2f}",
+         f"{grade - stats['mean_grade']:+.2f}"],
+    ]
+    table = Table(data, colWidths=[110, 75, 85, 80, 80, 70])
+    table.setStyle(_card_table_style())
+
+    story = [
+        Paragraph("Student Report Card", styles['CustomTitle']),
+        Paragraph(f"Name: {escape(str(name))} &nbsp;&nbsp; ID: {escape(str(student_id))} &nbsp;&nbsp; Attendance Level: {level}",
+                  styles['CompactNormal']),
+        Paragraph(f"Generated on: {generated_on}", styles['CompactNormal']),
+        Spacer(1, 10),
+        table,
+        Spacer(1, 10),
+    ]
+    # Same early-intervention threshold as the cohort report's recommendations
+    if attendance < 80:
+        story.append(Paragraph("Attendance is below 80%: recommended for early intervention.", styles['CompactNormal']))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# Characters replaced in a student ID to make it a safe file name
+UNSAFE_FILE_CHARS = r'[^A-Za-z0-9_.-]+'
+
+
+def _card_file_name(student_id, row, unique_ids):
+    safe_id = re.sub(UNSAFE_FILE_CHARS, '_', str(student_id))
+    return f"{safe_id}.pdf" if unique_ids else f"{safe_id}_{row}.pdf"
+
+
+def _render_batch(batch, stats, generated_on, output_dir, unique_ids):
+    """Worker task: render a batch of (row, student) pairs
+
+    Cards are written under output_dir when it is given; otherwise the PDF bytes
+    are sent back to the parent for zipping.
+    """
+    results = []
+    for row, student in batch:
+        file_name = _card_file_name(student[0], row, unique_ids)
+        pdf_bytes = render_report_card(student, stats, generated_on)
+        if output_dir is None:
+            results.append((file_name, pdf_bytes))
+        else:
+            with open(os.path.join(output_dir, file_name), "wb") as f:
+                f.write(pdf_bytes)
+            results.append((file_name, None))
+    return results
+
+
+class ReportCardGenerator:
+    def __init__(self, df, stats):
+        self.df = df
+        self.stats = stats
+
+    def _batches(self, batch_size):
+        columns = ['ID', 'Name', 'Attendance', 'Average_Grade', 'Attendance_Level']
+        batch = []
+        for row, student in enumerate(self.df[columns].itertuples(index=False, name=None)):
+            batch.append((row, student))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def generate(self, output_dir="reports/cards", zip_path=None, workers=None, batch_size=500, progress=None):
+        """Render one report card per student across a process pool
+
+        Cards go to output_dir, or into a single archive at zip_path when given.
+        progress, if given, is called after each batch with a dict of done, total,
+        elapsed seconds and cards per second. Returns the same dict plus the output path.
+        """
+        total = len(self.df)
+        # Distinct IDs can sanitize to the same file name, so check the names themselves
+        unique_ids = self.df['ID'].astype(str).str.replace(UNSAFE_FILE_CHARS, '_', regex=True).is_unique
+        generated_on = datetime.now().strftime('%Y-%m-%d %H:%M')
+        target_dir = None
+        if zip_path is None:
+            os.makedirs(output_dir, exist_ok=True)
+            target_dir = output_dir
+        else:
+            os.makedirs(os.path.dirname(zip_path) or ".", exist_ok=True)
+
+        archive = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) if zip_path else None
+        started = time.perf_counter()
+        done = 0
+
+        def report(results):
+            nonlocal done
+            for file_name, pdf_bytes in results:
+                if archive is not None:
+                    archive.writestr(file_name, pdf_bytes)
+            done += len(results)
+            elapsed = time.perf_counter() - started
+            summary = {'done': done, 'total': total, 'seconds': elapsed,
+                       'cards_per_second': done / elapsed if elapsed else 0.0}
+            if progress:
+                progress(summary)
+            return summary
+
+        summary = {'done': 0, 'total': total, 'seconds': 0.0, 'cards_per_second': 0.0}
+        try:
+            if workers == 1:
+                for batch in self._batches(batch_size):
+                    summary = report(_render_batch(batch, self.stats, generated_on, target_dir, unique_ids))
+            else:
+                # Only a few batches are in flight at once, so finished PDF bytes are written and released
+                max_pending = 2 * (workers or os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    pending = set()
+                    for batch in self._batches(batch_size):
+                        if len(pending) >= max_pending:
+                            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                summary = report(future.result())
+                        pending.add(executor.submit(_render_batch, batch, self.stats, generated_on,
+                                                    target_dir, unique_ids))
+                    for future in as_completed(pending):
+                        summary = report(future.result())
+        finally:
+            if archive is not None:
+                archive.close()
+
+        summary['output'] = zip_path or output_dir
+        return summary
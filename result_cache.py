@@ -0,0 +1,122 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Two-level LRU cache for pipeline results keyed by a hash of the input bytes
+
+    Entries are held as Python objects in a size-bounded in-memory LRU and are
+    pickled under cache_dir/v<version>/<digest>/<name>.pkl so they survive process
+    restarts. Bump version whenever the shape of a cached result changes; entries
+    written under other versions are never read and age out of the disk level.
+    Both levels are bounded by the pickled size of their entries; the disk level
+    evicts by least recent access time.
+    """
+
+    def __init__(self, cache_dir="cache", max_memory_bytes=256 * 1024 ** 2, max_disk_bytes=2 * 1024 ** 3,
+                 version=1):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # (digest, name) -> (value, size)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(data):
+        """Content address for an uploaded file's bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    def get_or_compute(self, digest, name, compute):
+        """Return the cached value for (digest, name), computing and storing it on a miss"""
+        found, value = self.get(digest, name)
+        if found:
+            return value
+        value = compute()
+        self.put(digest, name, value)
+        return value
+
+    def get(self, digest, name):
+        key = (digest, name)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return True, self._memory[key][0]
+
+        path = self._path(digest, name)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            os.utime(path)  # Record the access for disk LRU eviction
+        except OSError:
+            return False, None
+        value = pickle.loads(payload)
+        self._remember(key, value, len(payload))
+        return True, value
+
+    def put(self, digest, name, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember((digest, name), value, len(payload))
+
+        path = self._path(digest, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a private temp file first so concurrent readers never see partial entries
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        self._evict_disk()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for path, _, _ in self._disk_entries():
+            os.remove(path)
+
+    def _path(self, digest, name):
+        return os.path.join(self.cache_dir, f"v{self.version}", digest, f"{name}.pkl")
+
+    def _remember(self, key, value, size):
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def _disk_entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if not file_name.endswith(".pkl"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _evict_disk(self):
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass  # Directory still holds other entries, or another process evicted it first
+            total -= size
@@ -0,0 +1,206 @@
+"""Local HTTP service for submitting datasets programmatically
+
+    python service.py --port 8765 --workers 4
+
+    POST /stats                 CSV body -> compute_statistics JSON
+    POST /jobs?pdf=1&plots=1    CSV body -> 202 {"job_id": ...}; 503 when the queue is full
+    GET  /jobs/<id>             job status and output file names
+    GET  /jobs/<id>/files/<name> download one output file
+
+Plot and PDF jobs run on a bounded process pool behind a bounded queue, each
+writing to its own <jobs-dir>/<id>/ directory. Once more than MAX_TRACKED_JOBS
+jobs exist, the oldest finished ones are forgotten and their directories
+deleted. Built on asyncio streams only, so it needs nothing beyond the
+pipeline's own dependencies.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from cli import run_pipeline
+
+MAX_BODY_BYTES = 512 * 1024 ** 2
+MAX_TRACKED_JOBS = 1000
+# Job directories are named by uuid4().hex; only these are ever removed from jobs_dir
+JOB_DIR_PATTERN = re.compile(r'[0-9a-f]{32}')
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+def _compute_statistics(data):
+    from dataset_manager import DatasetManager
+    from analzer import Analyzer
+
+    return Analyzer(DatasetManager(data, columnar=True).load_data()).compute_statistics()
+
+
+class ReportService:
+    def __init__(self, jobs_dir="jobs", workers=None, queue_size=32):
+        self.jobs_dir = jobs_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._worker_tasks = []
+
+    async def start(self, host, port):
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        # Jobs from a previous run are no longer tracked, so nothing could download them
+        for name in os.listdir(self.jobs_dir):
+            if JOB_DIR_PATTERN.fullmatch(name):
+                shutil.rmtree(os.path.join(self.jobs_dir, name), ignore_errors=True)
+        # One dispatcher per pool process keeps at most `workers` jobs in flight
+        self._worker_tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        return await asyncio.start_server(self._handle, host, port)
+
+    def close(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id, data, options = await self.queue.get()
+            job = self.jobs[job_id]
+            job['status'] = 'running'
+            try:
+                written = await loop.run_in_executor(
+                    self.executor, run_pipeline, data, job['output_dir'],
+                    options['text'], options['pdf'], options['plots'])
+                job['files'] = sorted(os.path.basename(path) for path in written.values())
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            finally:
+                self.queue.task_done()
+
+    def _submit(self, data, query):
+        if self.queue.full():
+            return 503, {'error': "Job queue is full, retry later"}
+        options = {key: query.get(key, ['0'])[0] in ('1', 'true', 'yes') for key in ('text', 'pdf', 'plots')}
+        job_id = uuid.uuid4().hex
+        output_dir = os.path.join(self.jobs_dir, job_id)
+        self.jobs[job_id] = {'id': job_id, 'status': 'queued', 'options': options,
+                             'output_dir': output_dir, 'files': [], 'error': None}
+        self._evict_jobs()
+        self.queue.put_nowait((job_id, data, options))
+        return 202, {'job_id': job_id, 'status': 'queued'}
+
+    def _evict_jobs(self):
+        """Forget the oldest finished jobs beyond MAX_TRACKED_JOBS and delete their output"""
+        while len(self.jobs) > MAX_TRACKED_JOBS:
+            finished = next((job_id for job_id, job in self.jobs.items()
+                             if job['status'] in ('done', 'failed')), None)
+            if finished is None:
+                return  # Queued and running jobs are never evicted
+            shutil.rmtree(self.jobs.pop(finished)['output_dir'], ignore_errors=True)
+
+    async def _route(self, method, path, query, body):
+        parts = [part for part in path.split('/') if part]
+        if parts == ['stats']:
+            if method != 'POST':
+                return 405, {'error': "Use POST"}
+            loop = asyncio.get_running_loop()
+            try:
+                # Stats run on a thread so large uploads do not block other connections
+                return 200, await loop.run_in_executor(None, _compute_statistics, body)
+            except ValueError as e:
+                return 400, {'error': str(e)}
+        if parts == ['jobs']:
+            if method != 'POST':
+                return 405, {'error': "Use POST"}
+            return self._submit(body, query)
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {'error': "Unknown job"}
+            if len(parts) == 2:
+                return 200, {key: value for key, value in job.items() if key != 'output_dir'}
+            if len(parts) == 4 and parts[2] == 'files' and parts[3] in job['files']:
+                with open(os.path.join(job['output_dir'], parts[3]), "rb") as f:
+                    return 200, f.read()
+        return 404, {'error': "Not found"}
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+            if len(request_line) != 3:
+                status, payload = 400, {'error': "Malformed request line"}
+            else:
+                method, target, _ = request_line
+                length = headers.get('content-length', '0')
+                length = int(length) if length.isascii() and length.isdigit() else None
+                if length is None:
+                    status, payload = 400, {'error': "Invalid Content-Length"}
+                elif method == 'POST' and 'content-length' not in headers:
+                    status, payload = 411, {'error': "Content-Length required"}
+                elif length > MAX_BODY_BYTES:
+                    status, payload = 413, {'error': "Dataset too large"}
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    url = urlsplit(target)
+                    status, payload = await self._route(method, url.path, parse_qs(url.query), body)
+        except Exception as e:
+            status, payload = 500, {'error': str(e)}
+
+        if isinstance(payload, bytes):
+            content_type, content = "application/octet-stream", payload
+        else:
+            content_type, content = "application/json", json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {len(content)}\r\nConnection: close\r\n")
+        if status == 503:
+            head += "Retry-After: 5\r\n"
+        writer.write(head.encode('latin-1') + b"\r\n" + content)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(host, port, jobs_dir, workers, queue_size):
+    service = ReportService(jobs_dir, workers, queue_size)
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{port} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the attendance analysis pipeline over HTTP")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--jobs-dir', default="jobs")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=32, help="Queued jobs before new ones get 503")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.jobs_dir, args.workers, args.queue_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+import json
+import math
+import os
+import numpy as np
+
+# Bumped whenever the persisted StreamingStatistics layout changes
+STATE_VERSION = 1
+
+
+class ColumnMoments:
+    """Mergeable one-pass count/mean/M2/min/max accumulator for a single column"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        other = ColumnMoments()
+        other.count = int(values.size)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        return self.merge(other)
+
+    def merge(self, other):
+        # Chan et al. pairwise update of the running mean and squared deviations
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.count = int(state['count'])
+        moments.mean = float(state['mean'])
+        moments.m2 = float(state['m2'])
+        if moments.count:
+            moments.min = float(state['min'])
+            moments.max = float(state['max'])
+        return moments
+
+
+class StreamingStatistics:
+    """Mergeable accumulator producing the same stats as Analyzer.compute_statistics
+
+    Missing values are mean-filled by DatasetManager before analysis, which leaves
+    each column's mean, min, max and squared deviations unchanged and adds zero to
+    the co-moment, so the filled statistics can be recovered from the observed
+    values of each column plus the co-moment over rows where both are present.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.attendance = ColumnMoments()
+        self.grade = ColumnMoments()
+        # Moments over rows where both attendance and grade are present
+        self.pair_count = 0
+        self.pair_mean_attendance = 0.0
+        self.pair_mean_grade = 0.0
+        self.pair_comoment = 0.0
+
+    def update(self, attendance, grade):
+        attendance = np.asarray(attendance, dtype='float64')
+        grade = np.asarray(grade, dtype='float64')
+        other = StreamingStatistics()
+        other.rows = int(attendance.size)
+        other.attendance.update(attendance)
+        other.grade.update(grade)
+        both = ~(np.isnan(attendance) | np.isnan(grade))
+        if both.any():
+            x, y = attendance[both], grade[both]
+            other.pair_count = int(x.size)
+            other.pair_mean_attendance = float(x.mean())
+            other.pair_mean_grade = float(y.mean())
+            other.pair_comoment = float(((x - other.pair_mean_attendance) * (y - other.pair_mean_grade)).sum())
+        return self.merge(other)
+
+    def update_frame(self, df):
+        return self.update(df['Attendance'].to_numpy(dtype='float64', na_value=np.nan),
+                           df['Average_Grade'].to_numpy(dtype='float64', na_value=np.nan))
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.attendance.merge(other.attendance)
+        self.grade.merge(other.grade)
+        if other.pair_count:
+            count = self.pair_count + other.pair_count
+            dx = other.pair_mean_attendance - self.pair_mean_attendance
+            dy = other.pair_mean_grade - self.pair_mean_grade
+            self.pair_comoment += other.pair_comoment + dx * dy * self.pair_count * other.pair_count / count
+            self.pair_mean_attendance += dx * other.pair_count / count
+            self.pair_mean_grade += dy * other.pair_count / count
+            self.pair_count = count
+        return self
+
+    def to_dict(self):
+        return {
+            'version': STATE_VERSION,
+            'rows': self.rows,
+            'attendance': self.attendance.to_dict(),
+            'grade': self.grade.to_dict(),
+            'pair_count': self.pair_count,
+            'pair_mean_attendance': self.pair_mean_attendance,
+            'pair_mean_grade': self.pair_mean_grade,
+            'pair_comoment': self.pair_comoment
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported statistics state version: {state.get('version')}")
+        accumulator = cls()
+        accumulator.rows = int(state['rows'])
+        accumulator.attendance = ColumnMoments.from_dict(state['attendance'])
+        accumulator.grade = ColumnMoments.from_dict(state['grade'])
+        accumulator.pair_count = int(state['pair_count'])
+        accumulator.pair_mean_attendance = float(state['pair_mean_attendance'])
+        accumulator.pair_mean_grade = float(state['pair_mean_grade'])
+        accumulator.pair_comoment = float(state['pair_comoment'])
+        return accumulator
+
+    def save(self, path):
+        """Persist the state as JSON, replacing any previous state atomically"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def correlation(self):
+        # Re-centre the pairwise co-moment on each column's overall mean
+        comoment = self.pair_comoment + self.pair_count * \
+            (self.pair_mean_attendance - self.attendance.mean) * (self.pair_mean_grade - self.grade.mean)
+        denominator = math.sqrt(self.attendance.m2 * self.grade.m2)
+        if self.rows < 2 or denominator == 0:
+            return math.nan
+        return comoment / denominator
+
+    def raw_statistics(self):
+        """Unrounded statistics in the key order used by Analyzer.compute_statistics"""
+        def observed(moments, value):
+            return value if moments.count else math.nan
+
+        return {
+            'mean_attendance': observed(self.attendance, self.attendance.mean),
+            'mean_grade': observed(self.grade, self.grade.mean),
+            'max_attendance': observed(self.attendance, self.attendance.max),
+            'min_attendance': observed(self.attendance, self.attendance.min),
+            'max_grade': observed(self.grade, self.grade.max),
+            'min_grade': observed(self.grade, self.grade.min),
+            'correlation': self.correlation()
+        }
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a relative error guarantee (DDSketch)
+
+    Values are counted in logarithmic buckets whose width grows with their
+    magnitude, so any quantile estimate is within relative_accuracy of the
+    true value at that rank. Memory depends only on the range of magnitudes
+    seen, not on the number of values, and merging two sketches adds their
+    bucket counts.
+    """
+
+    # Magnitudes below this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _bucket_counts(self, magnitudes):
+        indices = np.ceil(np.log(magnitudes) / self._log_gamma).astype('int64')
+        return zip(*np.unique(indices, return_counts=True))
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        return self.add(values)
+
+    def add(self, values, weight=1):
+        """Add each value `weight` times"""
+        values = np.atleast_1d(np.asarray(values, dtype='float64'))
+        for store, magnitudes in ((self.positive, values[values >= self.MIN_VALUE]),
+                                  (self.negative, -values[values <= -self.MIN_VALUE])):
+            if magnitudes.size:
+                for index, count in self._bucket_counts(magnitudes):
+                    store[int(index)] = store.get(int(index), 0) + int(count) * weight
+        self.zero_count += int(np.count_nonzero(np.abs(values) < self.MIN_VALUE)) * weight
+        self.count += int(values.size) * weight
+        return self
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _bucket_value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        # Ascending value order: most negative first, then zeros, then positives
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._bucket_value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self.positive))
+
+    def to_dict(self):
+        return {'relative_accuracy': self.relative_accuracy, 'count': self.count, 'zero_count': self.zero_count,
+                'positive': {str(k): v for k, v in self.positive.items()},
+                'negative': {str(k): v for k, v in self.negative.items()}}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['relative_accuracy'])
+        sketch.count = int(state['count'])
+        sketch.zero_count = int(state['zero_count'])
+        sketch.positive = {int(k): int(v) for k, v in state['positive'].items()}
+        sketch.negative = {int(k): int(v) for k, v in state['negative'].items()}
+        return sketch
+
+
+# Percentiles reported by DistributionStatistics, by output key
+PERCENTILES = {'p10': 0.10, 'p25': 0.25, 'median': 0.50, 'p75': 0.75, 'p90': 0.90}
+# Histogram bin edges shared by attendance and grades (percent scale)
+HISTOGRAM_EDGES = tuple(range(0, 101, 10))
+
+
+class DistributionStatistics:
+    """Mergeable percentile sketches and histograms for attendance and grades
+
+    Missing values are only counted while streaming. They are placed at each
+    column's final mean when results are produced, matching the mean fill
+    DatasetManager applies before analysis.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.sketches = {'attendance': QuantileSketch(relative_accuracy), 'grade': QuantileSketch(relative_accuracy)}
+        self.histograms = {name: np.zeros(len(HISTOGRAM_EDGES) + 1, dtype='int64') for name in self.sketches}
+        self.missing = {name: 0 for name in self.sketches}
+
+    def update(self, attendance, grade):
+        for name, values in (('attendance', attendance), ('grade', grade)):
+            values = np.asarray(values, dtype='float64')
+            observed = values[~np.isnan(values)]
+            self.missing[name] += int(values.size - observed.size)
+            self.sketches[name].add(observed)
+            self.histograms[name] += _histogram_counts(observed)
+        return self
+
+    def update_frame(self, df):
+        return self.update(df['Attendance'].to_numpy(dtype='float64', na_value=np.nan),
+                           df['Average_Grade'].to_numpy(dtype='float64', na_value=np.nan))
+
+    def merge(self, other):
+        for name in self.sketches:
+            self.sketches[name].merge(other.sketches[name])
+            self.histograms[name] += other.histograms[name]
+            self.missing[name] += other.missing[name]
+        return self
+
+    def results(self, means):
+        """Percentiles and histograms per column, given each column's mean for the missing values
+
+        means maps 'attendance' and 'grade' to the column means, e.g. from
+        StreamingStatistics.raw_statistics().
+        """
+        results = {'relative_accuracy': self.relative_accuracy}
+        for name, sketch in self.sketches.items():
+            histogram = self.histograms[name].copy()
+            if self.missing[name] and not math.isnan(means[name]):
+                sketch = QuantileSketch(self.relative_accuracy).merge(sketch).add(means[name], self.missing[name])
+                histogram += _histogram_counts(np.array([means[name]])) * self.missing[name]
+            column = {key: _round(sketch.quantile(q)) for key, q in PERCENTILES.items()}
+            column['histogram'] = {
+                'edges': list(HISTOGRAM_EDGES),
+                'counts': histogram[1:-1].tolist(),
+                'below': int(histogram[0]),
+                'above': int(histogram[-1]),
+            }
+            results[name] = column
+        return results
+
+
+def _histogram_counts(values):
+    """Counts per [below, bin 1 .. bin n, above] with the last bin closed at 100"""
+    bins = np.searchsorted(HISTOGRAM_EDGES, values, side='right')
+    bins[values == HISTOGRAM_EDGES[-1]] = len(HISTOGRAM_EDGES) - 1
+    return np.bincount(bins, minlength=len(HISTOGRAM_EDGES) + 1)
+
+
+def _round(value):
+    return None if math.isnan(value) else round(value, 2)
@@ -1,4 +1,144 @@
+import numpy as np
+import pandas as pd
+
+# Attendance level labels indexed by their uint8 level code
+ATTENDANCE_LEVELS = ('Low', 'Medium', 'High')
+# Lower bounds (inclusive) of the Medium and High attendance levels
+ATTENDANCE_THRESHOLDS = (60, 80)
+
+
+def attendance_level_codes(attendance):
+    """Vectorized equivalent of Student.categorize_attendance returning level codes"""
+    attendance = np.asarray(attendance, dtype='float64')
+    codes = np.searchsorted(ATTENDANCE_THRESHOLDS, attendance, side='right').astype('uint8')
+    # Comparisons against NaN are False in categorize_attendance, so NaN falls to 'Low'
+    codes[np.isnan(attendance)] = 0
+    return codes
+
+
+def categorize_attendance_levels(attendance):
+    """Vectorized equivalent of Student.categorize_attendance returning level labels"""
+    return np.asarray(ATTENDANCE_LEVELS, dtype=object)[attendance_level_codes(attendance)]
+
+
+def _widen(values):
+    """Convert float32 values to the float64 nearest their 7 significant decimal digits
+
+    A plain astype would turn a stored 88.7 into 88.69999694824219, which then
+    leaks into min/max statistics and reports.
+    """
+    values = values.astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.floor(np.log10(np.abs(values)))
+    scale = 10.0 ** np.clip(6 - np.nan_to_num(magnitude, posinf=0, neginf=0), -300, 22)
+    return np.round(values * scale) / scale
+
+
+def _plain(value):
+    """Turn a numpy scalar read from a collection into the matching Python object"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _compact_ids(student_ids):
+    student_ids = np.asarray(student_ids)
+    if student_ids.dtype.kind in 'iub':
+        return student_ids.astype('int64')
+    if student_ids.dtype.kind == 'f' and np.all(np.isfinite(student_ids)) \
+            and np.all(student_ids == np.trunc(student_ids)):
+        return student_ids.astype('int64')
+    # Non-integer IDs (e.g. "S001") are kept as-is
+    return student_ids
+
+
+class StudentCollection:
+    """Students stored column-wise in typed arrays
+
+    IDs are int64, attendance and grade float32, the attendance level a uint8
+    code into ATTENDANCE_LEVELS, and names are interned as int32 codes into a
+    shared name table. Indexing with an int returns a Student view; slices,
+    boolean masks and integer arrays return a new collection.
+    """
+
+    def __init__(self, student_ids, names, attendance, average_grades, level_codes=None):
+        attendance = np.asarray(attendance, dtype='float64')
+        self.student_ids = _compact_ids(student_ids)
+        name_codes, name_table = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=False)
+        self.name_codes = name_codes.astype('int32')
+        self.name_table = np.asarray(name_table, dtype=object)
+        self.attendance = attendance.astype('float32')
+        self.average_grades = np.asarray(average_grades, dtype='float32')
+        # Levels come from the float64 values so float32 rounding cannot move a student across a threshold
+        self.level_codes = attendance_level_codes(attendance) if level_codes is None \
+            else np.asarray(level_codes, dtype='uint8')
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a collection from an Analyzer frame (ID, Name, Attendance, Average_Grade)"""
+        return cls(df['ID'].to_numpy(), df['Name'].to_numpy(dtype=object),
+                   df['Attendance'].to_numpy(dtype='float64'), df['Average_Grade'].to_numpy(dtype='float64'))
+
+    def to_frame(self):
+        """Analyzer frame for this collection, built column-wise"""
+        return pd.DataFrame({
+            'ID': self.student_ids,
+            'Name': self.name_table[self.name_codes],
+            'Attendance': _widen(self.attendance),
+            'Average_Grade': _widen(self.average_grades),
+            'Attendance_Level': np.asarray(ATTENDANCE_LEVELS, dtype=object)[self.level_codes]
+        })
+
+    @property
+    def nbytes(self):
+        arrays = (self.student_ids, self.name_codes, self.attendance, self.average_grades, self.level_codes)
+        return sum(array.nbytes for array in arrays)
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield _StudentView(self, index)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("student index out of range")
+            return _StudentView(self, int(key))
+        return self._take(key)
+
+    def filter(self, mask):
+        """Subset by a boolean mask or a predicate taking the collection and returning one"""
+        if callable(mask):
+            mask = mask(self)
+        return self._take(np.asarray(mask, dtype=bool))
+
+    def by_level(self, level):
+        return self._take(self.level_codes == ATTENDANCE_LEVELS.index(level))
+
+    def _take(self, key):
+        subset = StudentCollection.__new__(StudentCollection)
+        subset.student_ids = self.student_ids[key]
+        subset.name_codes = self.name_codes[key]
+        subset.name_table = self.name_table
+        subset.attendance = self.attendance[key]
+        subset.average_grades = self.average_grades[key]
+        subset.level_codes = self.level_codes[key]
+        return subset
+
+    def __repr__(self):
+        return f"StudentCollection({len(self)} students)"
+
+
 class Student:
+    """One student's record, stored in slots rather than a per-instance __dict__
+
+    Students read from a StudentCollection are _StudentView objects, which
+    expose the same fields straight from the collection's arrays.
+    """
+    __slots__ = ('student_id', 'name', 'attendance', 'average_grade', 'attendance_level')
+
     def __init__(self, student_id, name, attendance, average_grade):
         self.student_id = student_id
         self.name = name
@@ -16,3 +156,37 @@ class Student:
 
     def __repr__(self):
         return f"{self.name} ({self.attendance_level}) - Grade: {self.average_grade}"
+
+
+class _StudentView(Student):
+    """Student backed by one row of a StudentCollection; the properties shadow Student's slots"""
+    __slots__ = ('_collection', '_index')
+
+    def __init__(self, collection, index):
+        self._collection = collection
+        self._index = index
+
+    # Fields come back as Python objects, so callers can do arithmetic or json.dumps them as before
+    @property
+    def student_id(self):
+        return _plain(self._collection.student_ids[self._index])
+
+    @property
+    def name(self):
+        return self._collection.name_table[self._collection.name_codes[self._index]]
+
+    @property
+    def attendance(self):
+        return float(_widen(self._collection.attendance[self._index]))
+
+    @property
+    def average_grade(self):
+        return float(_widen(self._collection.average_grades[self._index]))
+
+    @property
+    def attendance_level(self):
+        return ATTENDANCE_LEVELS[self._collection.level_codes[self._index]]
+
+    def categorize_attendance(self):
+        # The level code was computed from the full-precision attendance, not the stored float32
+        return self.attendance_level
@@ -1,74 +1,173 @@
+import numpy as np
+import pandas as pd
 import seaborn as sns
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")  # Non-interactive backend: figures are only ever rendered to buffers
+from matplotlib.colors import LinearSegmentedColormap, to_rgba
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from concurrent.futures import ThreadPoolExecutor
+import io
 import os
 
+from instrumentation import stage
+
+# Target name -> DPI used when no targets are given to Visualizer.render
+DEFAULT_TARGETS = {'pdf': 300}
+# Above this many rows the scatter plot is drawn as a per-level density grid
+DENSITY_THRESHOLD = 100_000
+
+
 class Visualizer:
-    def __init__(self, df):
+    def __init__(self, df, density_threshold=DENSITY_THRESHOLD, density_bins=(200, 150)):
         self.df = df
-        os.makedirs("reports", exist_ok=True)
+        self.density_threshold = density_threshold
+        # Grid resolution (attendance bins, grade bins) for the density scatter
+        self.density_bins = density_bins
 
-    def scatter_plot(self):
-        plt.figure(figsize=(10, 6))
-        # Create scatter plot with larger points and better spacing
-        scatter = sns.scatterplot(
-            data=self.df,
-            x='Attendance',
-            y='Average_Grade',
-            hue='Attendance_Level',
-            s=100,
-            alpha=0.7
-        )
+    def scatter_figure(self):
+        # Figures are built with the object-oriented API so both can be drawn on separate threads
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        if len(self.df) > self.density_threshold:
+            handles = self._draw_density(ax)
+        else:
+            # One scatter call per attendance level instead of a per-point hue mapping
+            for level in self.df['Attendance_Level'].drop_duplicates():
+                subset = self.df[self.df['Attendance_Level'] == level]
+                ax.scatter(subset['Attendance'], subset['Average_Grade'], s=100, alpha=0.7,
+                           edgecolors='white', linewidths=0.5, label=str(level))
+            handles = None
         
         # Improve plot formatting
-        plt.title("Attendance vs Academic Performance", pad=20, fontsize=14)
-        plt.xlabel("Attendance (%)", labelpad=10)
-        plt.ylabel("Average Grade (%)", labelpad=10)
+        ax.set_title("Attendance vs Academic Performance", pad=20, fontsize=14)
+        ax.set_xlabel("Attendance (%)", labelpad=10)
+        ax.set_ylabel("Average Grade (%)", labelpad=10)
         
         # Add gridlines and adjust their style
-        plt.grid(True, linestyle='--', alpha=0.7)
+        ax.grid(True, linestyle='--', alpha=0.7)
         
         # Adjust layout to prevent cutoff
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Adjust legend position and format
-        plt.legend(title="Attendance Level", bbox_to_anchor=(1.05, 1), loc='upper left')
-        
-        # Save with high DPI and larger size
-        plt.savefig("reports/scatter_plot.png", dpi=300, bbox_inches='tight', pad_inches=0.5)
-        plt.close()
+        ax.legend(handles=handles, title="Attendance Level", bbox_to_anchor=(1.05, 1), loc='upper left')
+        return fig
 
-    def bar_chart(self):
-        plt.figure(figsize=(10, 6))
+    def _draw_density(self, ax):
+        """Draw Attendance x Average_Grade as one log-density image layer per attendance level
+
+        Points are binned with a single bincount over (level, grade bin, attendance
+        bin), so the cost of drawing no longer depends on the number of rows.
+        Returns legend handles for the layers.
+        """
+        x = self.df['Attendance'].to_numpy(dtype='float64')
+        y = self.df['Average_Grade'].to_numpy(dtype='float64')
+        # Levels are numbered in order of appearance, matching the per-point scatter colours
+        codes, levels = pd.factorize(self.df['Attendance_Level'])
+        valid = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+        x, y, codes = x[valid], y[valid], codes[valid]
+        if x.size == 0:
+            return []
+
+        nx, ny = self.density_bins
+        x0, x1 = _bin_range(x)
+        y0, y1 = _bin_range(y)
+        xi = np.minimum(((x - x0) / (x1 - x0) * nx).astype('int64'), nx - 1)
+        yi = np.minimum(((y - y0) / (y1 - y0) * ny).astype('int64'), ny - 1)
+        counts = np.bincount((codes * ny + yi) * nx + xi, minlength=len(levels) * ny * nx)
+        density = np.log1p(counts.reshape(len(levels), ny, nx))
+        vmax = density.max()
+
+        handles = []
+        for index, level in enumerate(levels):
+            color = to_rgba(f"C{index}")
+            cmap = LinearSegmentedColormap.from_list(
+                f"density_{index}", [color[:3] + (0.25,), color[:3] + (1.0,)])
+            cmap.set_bad((0, 0, 0, 0))  # Empty cells stay transparent
+            ax.imshow(np.ma.masked_equal(density[index], 0), cmap=cmap, vmin=0, vmax=vmax,
+                      origin='lower', extent=(x0, x1, y0, y1), aspect='auto', interpolation='nearest')
+            handles.append(Patch(color=color, label=str(level)))
+        return handles
+
+    def bar_figure(self):
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
         
         # Calculate average grades
-        avg_grades = self.df.groupby('Attendance_Level')['Average_Grade'].mean()
+        avg_grades = self.df.groupby('Attendance_Level', observed=True)['Average_Grade'].mean()
         
         # Create bar plot with better formatting
-        bar = sns.barplot(
-            x=avg_grades.index,
-            y=avg_grades.values,
-            palette='deep'
-        )
+        positions = range(len(avg_grades))
+        ax.bar(positions, avg_grades.values, color=sns.color_palette('deep', len(avg_grades)))
+        ax.set_xticks(list(positions), [str(level) for level in avg_grades.index])
         
         # Add value labels on top of bars
         for i, v in enumerate(avg_grades.values):
-            bar.text(i, v, f'{v:.1f}%', ha='center', va='bottom')
+            ax.text(i, v, f'{v:.1f}%', ha='center', va='bottom')
         
         # Improve plot formatting
-        plt.title("Average Grade by Attendance Level", pad=20, fontsize=14)
-        plt.xlabel("Attendance Level", labelpad=10)
-        plt.ylabel("Average Grade (%)", labelpad=10)
+        ax.set_title("Average Grade by Attendance Level", pad=20, fontsize=14)
+        ax.set_xlabel("Attendance Level", labelpad=10)
+        ax.set_ylabel("Average Grade (%)", labelpad=10)
         
         # Add gridlines
-        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
+        ax.grid(True, axis='y', linestyle='--', alpha=0.7)
         
         # Ensure y-axis starts at 0 and has reasonable margin at top
         max_grade = avg_grades.max()
-        plt.ylim(0, max_grade * 1.15)  # Add 15% margin at top
+        ax.set_ylim(0, max_grade * 1.15)  # Add 15% margin at top
         
         # Adjust layout
-        plt.tight_layout()
-        
+        fig.tight_layout()
+        return fig
+
+    def render(self, targets=None, concurrent=True):
+        """Render each chart once and rasterize it to PNG bytes for every target
+
+        targets maps a target name (e.g. 'dashboard', 'pdf') to its DPI. Returns
+        {target: {'scatter_plot': png_bytes, 'bar_chart': png_bytes}}; targets
+        sharing a DPI share the same bytes. With concurrent=True the two charts
+        are drawn on separate threads.
+        """
+        targets = targets or DEFAULT_TARGETS
+        dpis = sorted(set(targets.values()))
+        builders = {'scatter_plot': self.scatter_figure, 'bar_chart': self.bar_figure}
+
+        def draw(name):
+            fig = builders[name]()
+            return name, {dpi: _png_bytes(fig, dpi) for dpi in dpis}
+
+        with stage('plot', rows=len(self.df)):
+            if concurrent:
+                with ThreadPoolExecutor(max_workers=len(builders)) as executor:
+                    rendered = dict(executor.map(draw, builders))
+            else:
+                rendered = dict(map(draw, builders))
+
+        return {target: {name: rendered[name][dpi] for name in builders} for target, dpi in targets.items()}
+
+    def scatter_plot(self):
+        os.makedirs("reports", exist_ok=True)
+        # Save with high DPI and larger size
+        with stage('plot', rows=len(self.df)), open("reports/scatter_plot.png", "wb") as f:
+            f.write(_png_bytes(self.scatter_figure(), 300))
+
+    def bar_chart(self):
+        os.makedirs("reports", exist_ok=True)
         # Save with high DPI
-        plt.savefig("reports/bar_chart.png", dpi=300, bbox_inches='tight', pad_inches=0.5)
-        plt.close()
+        with stage('plot', rows=len(self.df)), open("reports/bar_chart.png", "wb") as f:
+            f.write(_png_bytes(self.bar_figure(), 300))
+
+
+def _bin_range(values):
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return low, high
+
+
+def _png_bytes(fig, dpi):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches='tight', pad_inches=0.5)
+    return buffer.getvalue()